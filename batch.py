@@ -0,0 +1,128 @@
+import sys
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from loader import compact_from_buffer, snapshot_size, write_snapshot
+from main import ALGORITHMS, Graph
+
+
+class BatchResult(NamedTuple):
+    index: int  # posisi pasangan dalam masukan; hasil datang tidak berurutan
+    start: str
+    end: str
+    cost: float
+    path: List[str]
+
+
+# Graf milik proses worker, dibuka sekali dari shared memory saat worker dimulai
+_worker_graph: Optional[Graph] = None
+_worker_algorithm = "Dijkstra"
+_worker_memory = None
+
+
+class _BufferWriter:
+    # Objek mirip berkas yang menulis snapshot langsung ke buffer shared memory
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+        self._position = 0
+
+    def write(self, data) -> None:
+        raw = memoryview(data).cast("B")
+        self._buffer[self._position:self._position + len(raw)] = raw
+        self._position += len(raw)
+
+
+def _attach(name: str):
+    from multiprocessing import shared_memory
+
+    # Pemilik segmen adalah proses induk; worker tidak perlu ikut melacaknya
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(
+    memory_name: str, algorithm: str, heuristic_formula: str, landmarks: Optional[List[int]], landmark_offset: int
+) -> None:
+    global _worker_graph, _worker_algorithm, _worker_memory
+    _worker_memory = _attach(memory_name)
+    compact, speed = compact_from_buffer(_worker_memory.buf)
+    _worker_graph = Graph.from_compact(compact, speed, heuristic_formula)
+    if landmarks is not None:
+        from landmarks import LandmarkTable
+
+        # Tabel jarak landmark dibaca langsung dari segmen, tepat setelah snapshot graf
+        size = compact.num_nodes * len(landmarks) * 8
+        distances = _worker_memory.buf[landmark_offset:landmark_offset + size].cast("d")
+        _worker_graph.landmarks = LandmarkTable(compact, landmarks, distances)
+    _worker_algorithm = algorithm
+
+
+def _solve_chunk(chunk: List[Tuple[int, str, str]]) -> List[BatchResult]:
+    results = []
+    for index, start, end in chunk:
+        cost, path = _worker_graph.route(start, end, _worker_algorithm)
+        results.append(BatchResult(index, start, end, cost, path))
+    return results
+
+
+def _chunks(pairs: Iterable[Tuple[str, str]], chunk_size: int) -> Iterator[List[Tuple[int, str, str]]]:
+    chunk: List[Tuple[int, str, str]] = []
+    for index, (start, end) in enumerate(pairs):
+        chunk.append((index, start, end))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def route_batch(
+    graph: Graph,
+    pairs: Iterable[Tuple[str, str]],
+    algorithm: str = "Dijkstra",
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+) -> Iterator[BatchResult]:
+    # Sebar kueri asal/tujuan ke pool proses. Graf ditulis sekali sebagai snapshot ke
+    # shared memory; setiap worker memetakan array CSR dari segmen yang sama tanpa
+    # unpickle salinan graf. Hasil dikirim balik per potongan (`chunk_size` pasangan)
+    # segera setelah selesai, jadi urutannya tidak dijamin — gunakan BatchResult.index.
+    import multiprocessing
+    import os
+    from multiprocessing import shared_memory
+
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Algoritma '{algorithm}' tidak dikenal.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size minimal 1.")
+    workers = workers if workers is not None else os.cpu_count() or 1
+    if workers <= 1:
+        for chunk in _chunks(pairs, chunk_size):
+            for index, start, end in chunk:
+                cost, path = graph.route(start, end, algorithm)
+                yield BatchResult(index, start, end, cost, path)
+        return
+
+    compact = graph.compact()
+    # Worker harus menjawab sama seperti graph.route: rumus heuristik dan tabel landmark
+    # (jika masih berlaku untuk graf ini) ikut dikirim; jaraknya ditaruh setelah snapshot
+    table = graph.landmarks if graph.landmarks is not None and graph.landmarks.compact is compact else None
+    landmark_offset = snapshot_size(compact)
+    distances = memoryview(table.distances).cast("B") if table is not None else memoryview(b"")
+    memory = shared_memory.SharedMemory(create=True, size=max(1, landmark_offset + len(distances)))
+    try:
+        write_snapshot(compact, _BufferWriter(memory.buf), graph.average_speed_kmph)
+        memory.buf[landmark_offset:landmark_offset + len(distances)] = distances
+        initargs = (
+            memory.name,
+            algorithm,
+            graph.heuristic_formula,
+            list(table.landmarks) if table is not None else None,
+            landmark_offset,
+        )
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            for results in pool.imap_unordered(_solve_chunk, _chunks(pairs, chunk_size)):
+                yield from results
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,270 @@
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from main import ALGORITHMS, AVERAGE_SPEED_KMPH, Graph, SearchStats, haversine_km, solve_multi_stop
+
+# Suite benchmark Dijkstra vs A* pada jaringan sintetis ber-seed (dapat diulang persis).
+# Contoh: python benchmark.py --sizes 1000 10000 100000 --out hasil.json
+# Hasil ditulis sebagai JSON agar dua run (mis. sebelum/sesudah perubahan) bisa dibandingkan.
+
+ORIGIN = (116.80, -1.30)  # sudut barat daya area sintetis, sekitar Balikpapan
+KM_PER_DEGREE = 111.32
+
+
+def _point(x_km: float, y_km: float) -> Tuple[float, float]:
+    return ORIGIN[0] + x_km / KM_PER_DEGREE, ORIGIN[1] + y_km / KM_PER_DEGREE
+
+
+def _travel_minutes(a: Tuple[float, float], b: Tuple[float, float], rng: random.Random, detour: float) -> float:
+    # Waktu tempuh >= jarak lurus pada kecepatan rata-rata, jadi heuristik haversine tetap admissible
+    return haversine_km(a, b) / AVERAGE_SPEED_KMPH * 60.0 * (1.0 + detour * rng.random())
+
+
+def grid_graph(nodes: int, seed: int, spacing_km: float = 0.2) -> Graph:
+    rng = random.Random(seed)
+    side = max(2, int(math.sqrt(nodes)))
+    graph = Graph(average_speed_kmph=AVERAGE_SPEED_KMPH)
+    coords = {}
+    for row in range(side):
+        for col in range(side):
+            name = f"g{row}_{col}"
+            coords[name] = _point(col * spacing_km, row * spacing_km)
+            graph.add_node(name, coords[name])
+    for row in range(side):
+        for col in range(side):
+            here = f"g{row}_{col}"
+            for other in (f"g{row}_{col + 1}" if col + 1 < side else None, f"g{row + 1}_{col}" if row + 1 < side else None):
+                if other:
+                    graph.add_edge(here, other, _travel_minutes(coords[here], coords[other], rng, 0.5))
+    return graph
+
+
+def geometric_graph(nodes: int, seed: int, mean_degree: float = 6.0) -> Graph:
+    # Titik acak seragam; dua titik terhubung jika jaraknya di bawah radius yang
+    # memberi derajat rata-rata `mean_degree`
+    rng = random.Random(seed)
+    side_km = math.sqrt(nodes) * 0.2
+    radius = math.sqrt(mean_degree * side_km * side_km / (math.pi * nodes))
+    graph = Graph(average_speed_kmph=AVERAGE_SPEED_KMPH)
+    cells: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = {}
+    for i in range(nodes):
+        x, y = rng.random() * side_km, rng.random() * side_km
+        name = f"r{i}"
+        graph.add_node(name, _point(x, y))
+        cells.setdefault((int(x / radius), int(y / radius)), []).append((name, x, y))
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other, ox, oy in cells.get((cx + dx, cy + dy), []):
+                    for name, x, y in members:
+                        if name < other and (x - ox) ** 2 + (y - oy) ** 2 <= radius * radius:
+                            graph.add_edge(name, other, _travel_minutes(_point(x, y), _point(ox, oy), rng, 0.5))
+    return graph
+
+
+def road_graph(nodes: int, seed: int, spacing_km: float = 0.3) -> Graph:
+    # Jaringan mirip jalan kota: grid yang digeser acak, sebagian ruas dihapus,
+    # beberapa diagonal lokal, dan jalan arteri cepat setiap 8 baris/kolom
+    rng = random.Random(seed)
+    side = max(2, int(math.sqrt(nodes)))
+    graph = Graph(average_speed_kmph=AVERAGE_SPEED_KMPH)
+    coords = {}
+    for row in range(side):
+        for col in range(side):
+            name = f"j{row}_{col}"
+            jitter_x, jitter_y = (rng.random() - 0.5) * spacing_km * 0.6, (rng.random() - 0.5) * spacing_km * 0.6
+            coords[name] = _point(col * spacing_km + jitter_x, row * spacing_km + jitter_y)
+            graph.add_node(name, coords[name])
+    for row in range(side):
+        for col in range(side):
+            here = f"j{row}_{col}"
+            arterial_row, arterial_col = row % 8 == 0, col % 8 == 0
+            neighbors = []
+            if col + 1 < side:
+                neighbors.append((f"j{row}_{col + 1}", arterial_row))
+            if row + 1 < side:
+                neighbors.append((f"j{row + 1}_{col}", arterial_col))
+            if row + 1 < side and col + 1 < side and rng.random() < 0.1:
+                neighbors.append((f"j{row + 1}_{col + 1}", False))
+            for other, arterial in neighbors:
+                if not arterial and rng.random() < 0.15:
+                    continue  # ruas tertutup/tidak ada
+                detour = 0.1 if arterial else 1.0
+                graph.add_edge(here, other, _travel_minutes(coords[here], coords[other], rng, detour))
+    return graph
+
+
+GENERATORS: Dict[str, Callable[[int, int], Graph]] = {
+    "grid": grid_graph,
+    "geometric": geometric_graph,
+    "road": road_graph,
+}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _measure_queries(query: Callable[[str, str], object], pairs: List[Tuple[str, str]]) -> Dict[str, float]:
+    latencies = []
+    started = time.perf_counter()
+    for start, end in pairs:
+        begin = time.perf_counter()
+        query(start, end)
+        latencies.append((time.perf_counter() - begin) * 1000.0)
+    elapsed = time.perf_counter() - started
+    return {
+        "p50_ms": _percentile(latencies, 0.50),
+        "p90_ms": _percentile(latencies, 0.90),
+        "p99_ms": _percentile(latencies, 0.99),
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "throughput_qps": len(pairs) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def _peak_kib(action: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        action()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def _timed(action: Callable[[], object]) -> Tuple[object, float]:
+    started = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - started
+
+
+def bench_network(
+    generator: str, nodes: int, seed: int, queries: int, stops: List[int], landmarks: int, with_ch: bool
+) -> Dict[str, object]:
+    graph, build_s = _timed(lambda: GENERATORS[generator](nodes, seed))
+    _, compact_s = _timed(graph.compact)
+    graph.route_cache.capacity = 0  # setiap kueri harus benar-benar dicari
+    rng = random.Random(seed + 1)
+    names = sorted(graph.nodes)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(queries)]
+    memory_pairs = pairs[: max(1, min(20, queries))]
+
+    modes: Dict[str, Dict[str, float]] = {}
+
+    def run_mode(mode: str, query: Callable[[str, str], object], preprocess_s: float, algorithm: str) -> None:
+        # Setiap mode mulai dengan tabel heuristik kosong. Kueri pertama (impor NumPy dan
+        # sejenisnya) dicatat terpisah sebagai warmup_ms, dan total waktu pembangunan tabel
+        # heuristik selama pengukuran dilaporkan sebagai table_build_ms.
+        tables = graph.heuristic_tables
+        tables.clear()
+        _, warmup_s = _timed(lambda: query(*pairs[0]))
+        tables.clear()
+        builds, build_s = tables.builds, tables.build_s
+        result = _measure_queries(query, pairs)
+        result["warmup_ms"] = warmup_s * 1000.0
+        result["table_builds"] = tables.builds - builds
+        result["table_build_ms"] = (tables.build_s - build_s) * 1000.0
+        result["preprocess_s"] = preprocess_s
+        result["peak_kib"] = _peak_kib(lambda: [query(start, end) for start, end in memory_pairs])
+        if algorithm:
+            stats = SearchStats(algorithm)
+            for start, end in memory_pairs:
+                graph.route(start, end, algorithm, stats=stats)
+            result["mean_settled"] = stats.settled / max(1, stats.searches)
+        modes[mode] = result
+
+    for algorithm in ALGORITHMS:
+        run_mode(algorithm, lambda a, b, alg=algorithm: graph.route(a, b, alg), 0.0, algorithm)
+
+    if landmarks > 0:
+        _, alt_s = _timed(lambda: graph.prepare_landmarks(landmarks))
+        run_mode("A* (ALT)", lambda a, b: graph.route(a, b, "A*"), alt_s, "A*")
+        run_mode("Bidirectional A* (ALT)", lambda a, b: graph.route(a, b, "Bidirectional A*"), alt_s, "Bidirectional A*")
+        graph.landmarks = None
+
+    if with_ch:
+        from contraction import ContractionHierarchy
+
+        hierarchy, ch_s = _timed(lambda: ContractionHierarchy.build(graph))
+        run_mode("Contraction Hierarchy", hierarchy.query, ch_s, "")
+
+    multi_stop = []
+    depot = names[0]
+    for count in stops:
+        if count >= len(names):
+            continue
+        destinations = rng.sample(names[1:], count)
+        result, solve_s = _timed(lambda: solve_multi_stop(graph, depot, destinations, "Dijkstra", return_to_start=True))
+        multi_stop.append({"stops": count, "tier": result.tier, "cost": result.cost, "solve_s": solve_s})
+
+    compact = graph.compact()
+    return {
+        "generator": generator,
+        "nodes": compact.num_nodes,
+        "edges": compact.num_edges // 2,
+        "build_s": build_s,
+        "compact_s": compact_s,
+        "graph_peak_kib": _peak_kib(lambda: GENERATORS[generator](nodes, seed).compact()) if nodes <= 20000 else None,
+        "modes": modes,
+        "multi_stop": multi_stop,
+    }
+
+
+def bench_haversine(calls: int, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    points = [_point(rng.random() * 50, rng.random() * 50) for _ in range(1024)]
+    started = time.perf_counter()
+    for i in range(calls):
+        haversine_km(points[i & 1023], points[(i * 7 + 3) & 1023])
+    elapsed = time.perf_counter() - started
+    return {"calls": calls, "calls_per_s": calls / elapsed if elapsed > 0 else 0.0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Dijkstra vs A* pada jaringan sintetis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--generators", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--stops", type=int, nargs="+", default=[3, 5, 8, 12, 15, 20, 40])
+    parser.add_argument("--landmarks", type=int, default=8, help="0 untuk melewati mode ALT")
+    parser.add_argument("--no-ch", action="store_true", help="lewati contraction hierarchy")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="benchmark.json")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "queries": args.queries,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "haversine": bench_haversine(200000, args.seed),
+        "networks": [],
+    }
+    for generator in args.generators:
+        for size in args.sizes:
+            print(f"[benchmark] {generator} {size} node ...", flush=True)
+            report["networks"].append(
+                bench_network(generator, size, args.seed, args.queries, args.stops, args.landmarks, not args.no_ch)
+            )
+
+    with open(args.out, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Hasil benchmark ditulis ke {args.out}")
+
+
+if __name__ == "__main__":
+    main()
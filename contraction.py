@@ -0,0 +1,282 @@
+import hashlib
+import heapq
+import math
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from main import CompactGraph, Graph
+
+# Format berkas: header, offset nama (q), blob nama UTF-8, lalu array mentah dengan
+# urutan byte mesin pembuat (ditandai di header, seperti snapshot graf .bbmg)
+_MAGIC = b"BBMCH\x00\x02\x00"
+# magic, little-endian?, jumlah node, jumlah edge naik, panjang blob nama, sidik jari graf
+_HEADER = struct.Struct("<8s?7xqqq8s")
+
+
+class ContractionHierarchy:
+    # Contraction hierarchy untuk graf dua arah. Setiap node diberi peringkat
+    # (urutan kontraksi); `offsets/targets/weights/middles` menyimpan edge "naik"
+    # dalam format CSR: dari node ke tetangga berperingkat lebih tinggi.
+    # middles[i] == -1 berarti edge asli, selain itu id node yang dilompati shortcut.
+    def __init__(
+        self,
+        names: List[str],
+        rank: array,
+        offsets: array,
+        targets: array,
+        weights: array,
+        middles: array,
+        fingerprint: bytes = b"",
+    ):
+        self.names = names
+        self.rank = rank
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+        # Sidik jari graf sumber (lihat graph_fingerprint); kosong jika tidak diketahui
+        self.fingerprint = fingerprint
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def build(cls, graph: Graph, witness_settle_limit: int = 64) -> "ContractionHierarchy":
+        compact = graph.compact()
+        n = compact.num_nodes
+        # Graf sisa selama kontraksi: node -> {tetangga: (bobot, middle)}, hanya bobot terkecil
+        adjacency: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n)]
+        for u in range(n):
+            for v, weight in compact.neighbors(u):
+                if u != v and (v not in adjacency[u] or weight < adjacency[u][v][0]):
+                    adjacency[u][v] = (weight, -1)
+
+        contracted = bytearray(n)
+        deleted_neighbors = [0] * n
+        upward: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+        rank = array("i", [0]) * n
+
+        def priority(node: int) -> int:
+            shortcuts = _required_shortcuts(adjacency, node, witness_settle_limit)
+            return len(shortcuts) - len(adjacency[node]) + deleted_neighbors[node]
+
+        queue = [(priority(node), node) for node in range(n)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            if contracted[node]:
+                continue
+            # Pembaruan malas: hitung ulang prioritas, tunda jika tidak lagi terkecil
+            current = priority(node)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+
+            for u, v, weight in _required_shortcuts(adjacency, node, witness_settle_limit):
+                existing = adjacency[u].get(v)
+                if existing is None or weight < existing[0]:
+                    adjacency[u][v] = (weight, node)
+                    adjacency[v][u] = (weight, node)
+            for neighbor, (weight, middle) in adjacency[node].items():
+                upward[node].append((neighbor, weight, middle))
+                del adjacency[neighbor][node]
+                deleted_neighbors[neighbor] += 1
+            adjacency[node] = {}
+            contracted[node] = 1
+            rank[node] = order
+            order += 1
+
+        offsets = array("q", [0])
+        targets = array("i")
+        weights = array("d")
+        middles = array("i")
+        for node in range(n):
+            for neighbor, weight, middle in upward[node]:
+                targets.append(neighbor)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+        return cls(list(compact.names), rank, offsets, targets, weights, middles, graph_fingerprint(compact))
+
+    def _edge(self, u: int, v: int) -> Tuple[float, int]:
+        # Edge antara u dan v tersimpan di daftar naik milik node berperingkat lebih rendah
+        low, high = (u, v) if self.rank[u] < self.rank[v] else (v, u)
+        for i in range(self.offsets[low], self.offsets[low + 1]):
+            if self.targets[i] == high:
+                return self.weights[i], self.middles[i]
+        raise KeyError((u, v))
+
+    def _unpack(self, u: int, v: int, out: List[int]) -> None:
+        # Tambahkan jalur asli dari u ke v (tanpa u) ke `out`
+        stack = [(u, v)]
+        while stack:
+            a, b = stack.pop()
+            _, middle = self._edge(a, b)
+            if middle == -1:
+                out.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+
+    def _start_search(self, source: int) -> Tuple[List[Tuple[float, int]], Dict[int, float], Dict[int, int]]:
+        return [(0.0, source)], {source: 0.0}, {source: -1}
+
+    def query(self, start: str, end: str) -> Tuple[float, List[str]]:
+        source = self.index.get(start)
+        target = self.index.get(end)
+        if source is None or target is None:
+            return (0.0, [start]) if start == end else (float("inf"), [])
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        # Dua pencarian Dijkstra naik (dari start dan dari end) yang bertemu di puncak
+        searches = [self._start_search(source), self._start_search(target)]
+        settled: List[Dict[int, float]] = [{}, {}]
+        best, meeting = math.inf, -1
+        side = 0
+        while searches[0][0] or searches[1][0]:
+            if not searches[side][0] or (searches[1 - side][0] and searches[1 - side][0][0][0] < searches[side][0][0][0]):
+                side = 1 - side
+            queue, dist, pred = searches[side]
+            cost, node = heapq.heappop(queue)
+            if node in settled[side]:
+                continue
+            if cost >= best:
+                # Semua entri di antrian ini tidak mungkin memperbaiki hasil
+                queue.clear()
+                continue
+            settled[side][node] = cost
+            other = searches[1 - side][1]
+            if node in other and cost + other[node] < best:
+                best, meeting = cost + other[node], node
+            for i in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[i]
+                new_cost = cost + weights[i]
+                if new_cost < dist.get(neighbor, math.inf):
+                    dist[neighbor] = new_cost
+                    pred[neighbor] = node
+                    heapq.heappush(queue, (new_cost, neighbor))
+                    if neighbor in other and new_cost + other[neighbor] < best:
+                        best, meeting = new_cost + other[neighbor], neighbor
+
+        if meeting < 0:
+            return float("inf"), []
+
+        up_chain = _chain(searches[0][2], meeting)
+        down_chain = _chain(searches[1][2], meeting)
+        down_chain.reverse()
+        hops = up_chain + down_chain[1:]
+        path = [hops[0]]
+        for i in range(len(hops) - 1):
+            self._unpack(hops[i], hops[i + 1], path)
+
+        # Jumlahkan ulang bobot edge asli berurutan agar biaya sama persis dengan Dijkstra
+        total = 0.0
+        for i in range(len(path) - 1):
+            total += self._edge(path[i], path[i + 1])[0]
+        return total, [self.names[i] for i in path]
+
+    def matches(self, graph: Graph) -> bool:
+        # False jika graf sudah berubah (node, edge, atau bobot) sejak hierarki dibangun
+        return self.fingerprint == graph_fingerprint(graph.compact())
+
+    def save(self, path: str) -> None:
+        encoded = [name.encode("utf-8") for name in self.names]
+        name_offsets = array("q", [0])
+        for name in encoded:
+            name_offsets.append(name_offsets[-1] + len(name))
+        blob = b"".join(encoded)
+        little = sys.byteorder == "little"
+        with open(path, "wb") as handle:
+            handle.write(_HEADER.pack(_MAGIC, little, len(self.names), len(self.targets), len(blob), self.fingerprint))
+            name_offsets.tofile(handle)
+            handle.write(blob)
+            for values in (self.rank, self.offsets, self.targets, self.weights, self.middles):
+                values.tofile(handle)
+
+    @classmethod
+    def load(cls, path: str, graph: Optional[Graph] = None) -> "ContractionHierarchy":
+        # Jika `graph` diberikan, hierarki hanya diterima bila dibangun dari graf yang sama persis
+        with open(path, "rb") as handle:
+            header = handle.read(_HEADER.size)
+            if len(header) != _HEADER.size or header[:8] != _MAGIC:
+                raise ValueError(f"Berkas '{path}' bukan contraction hierarchy yang valid.")
+            _, little, num_nodes, num_edges, blob_size, fingerprint = _HEADER.unpack(header)
+            if little != (sys.byteorder == "little"):
+                raise ValueError(f"Berkas '{path}' dibuat pada mesin dengan urutan byte berbeda.")
+            if graph is not None and fingerprint != graph_fingerprint(graph.compact()):
+                raise ValueError(f"Berkas '{path}' dibuat untuk graf yang berbeda.")
+            name_offsets = array("q")
+            name_offsets.fromfile(handle, num_nodes + 1)
+            blob = handle.read(blob_size)
+            names = [blob[name_offsets[i]:name_offsets[i + 1]].decode("utf-8") for i in range(num_nodes)]
+            arrays = []
+            for typecode, count in (("i", num_nodes), ("q", num_nodes + 1), ("i", num_edges), ("d", num_edges), ("i", num_edges)):
+                values = array(typecode)
+                values.fromfile(handle, count)
+                arrays.append(values)
+        return cls(names, *arrays, fingerprint)
+
+
+def graph_fingerprint(graph: CompactGraph) -> bytes:
+    # Hash 8 byte atas nama node (diawali panjangnya), topologi, dan bobot edge
+    digest = hashlib.blake2b(digest_size=8)
+    for name in graph.names:
+        encoded = name.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "little"))
+        digest.update(encoded)
+    for values in (graph.offsets, graph.targets, graph.weights):
+        digest.update(memoryview(values).cast("B"))
+    return digest.digest()
+
+
+def _chain(pred: Dict[int, int], node: int) -> List[int]:
+    chain = [node]
+    while pred[node] != -1:
+        node = pred[node]
+        chain.append(node)
+    chain.reverse()
+    return chain
+
+
+def _required_shortcuts(
+    adjacency: List[Dict[int, Tuple[float, int]]], node: int, settle_limit: int
+) -> List[Tuple[int, int, float]]:
+    # Pasangan tetangga (u, v) yang jalur terpendeknya lewat `node`; dicek dengan
+    # pencarian saksi (witness) terbatas yang tidak melewati `node`
+    neighbors = list(adjacency[node].items())
+    shortcuts = []
+    for i, (u, (weight_u, _)) in enumerate(neighbors):
+        rest = neighbors[i + 1:]
+        if not rest:
+            continue
+        limit = weight_u + max(weight_v for _, (weight_v, _) in rest)
+        witness = _witness_search(adjacency, u, node, limit, settle_limit)
+        for v, (weight_v, _) in rest:
+            via = weight_u + weight_v
+            if witness.get(v, math.inf) > via:
+                shortcuts.append((u, v, via))
+    return shortcuts
+
+
+def _witness_search(
+    adjacency: List[Dict[int, Tuple[float, int]]], source: int, excluded: int, limit: float, settle_limit: int
+) -> Dict[int, float]:
+    dist = {source: 0.0}
+    queue = [(0.0, source)]
+    settled = 0
+    while queue and settled < settle_limit:
+        cost, node = heapq.heappop(queue)
+        if cost > dist.get(node, math.inf) or cost > limit:
+            if cost > limit:
+                break
+            continue
+        settled += 1
+        for neighbor, (weight, _) in adjacency[node].items():
+            if neighbor == excluded:
+                continue
+            new_cost = cost + weight
+            if new_cost < dist.get(neighbor, math.inf):
+                dist[neighbor] = new_cost
+                heapq.heappush(queue, (new_cost, neighbor))
+    return dist
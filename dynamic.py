@@ -0,0 +1,139 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from main import Graph
+
+
+class DynamicShortestPathTree:
+    # Pohon jalur terpendek dari satu sumber (mis. depot) yang diperbaiki secara
+    # inkremental gaya Ramalingam-Reps saat bobot edge berubah, alih-alih dihitung ulang.
+    # Dibuat lewat Graph.dynamic_tree(); graf memanggil _edge_changed setiap kali
+    # add_edge, update_edge_weight, atau remove_edge mengubah bobot efektif u-v
+    # (bobot terkecil di antara edge paralel, inf jika tidak ada edge).
+    def __init__(self, graph: Graph, source: str):
+        self.graph = graph
+        self.source = source
+        self.dist: Dict[str, float] = {}
+        self.parent: Dict[str, Optional[str]] = {}
+        self._children: Dict[str, Set[str]] = {}
+        # jumlah node yang jaraknya dihitung ulang pada perbaikan terakhir
+        self.last_repaired = 0
+
+        tree = graph.shortest_path_tree(source)
+        compact, space, gen = tree.graph, tree._space, tree._generation
+        self.dist[source] = 0.0
+        self.parent[source] = None
+        for node in range(compact.num_nodes):
+            if space.closed[node] != gen:
+                continue
+            name = compact.names[node]
+            if name == source:
+                continue
+            self.dist[name] = space.dist[node]
+            self._set_parent(name, compact.names[space.pred[node]])
+
+    def cost(self, target: str) -> float:
+        return self.dist.get(target, math.inf)
+
+    def path(self, target: str) -> List[str]:
+        if target not in self.dist:
+            return []
+        path = [target]
+        while self.parent[path[-1]] is not None:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        return path
+
+    def costs(self) -> Dict[str, float]:
+        return dict(self.dist)
+
+    def _set_parent(self, node: str, parent: Optional[str]) -> None:
+        old = self.parent.get(node)
+        if old is not None:
+            self._children[old].discard(node)
+        self.parent[node] = parent
+        if parent is not None:
+            self._children.setdefault(parent, set()).add(node)
+
+    def _neighbors(self, node: str) -> Iterable[Tuple[str, float]]:
+        return self.graph.edges.get(node, ())
+
+    def _edge_changed(self, u: str, v: str, old_weight: float, new_weight: float) -> None:
+        if u == v or old_weight == new_weight:
+            self.last_repaired = 0
+            return
+        if new_weight < old_weight:
+            self._decrease(u, v, new_weight)
+        elif self.parent.get(v) == u:
+            self._increase(v)
+        elif self.parent.get(u) == v:
+            self._increase(u)
+        else:
+            # Edge bukan bagian pohon: naik/hilangnya tidak mengubah jarak mana pun
+            self.last_repaired = 0
+
+    def _decrease(self, u: str, v: str, weight: float) -> None:
+        # Edge lebih murah: hanya node yang bisa dicapai lebih cepat lewat u-v yang
+        # berubah; Dijkstra dimulai dari ujung yang membaik dan berhenti sendiri
+        dist = self.dist
+        queue: List[Tuple[float, str]] = []
+        for a, b in ((u, v), (v, u)):
+            candidate = dist.get(a, math.inf) + weight
+            if candidate < dist.get(b, math.inf):
+                dist[b] = candidate
+                self._set_parent(b, a)
+                heapq.heappush(queue, (candidate, b))
+        self.last_repaired = self._propagate(queue, None)
+
+    def _increase(self, root: str) -> None:
+        # Edge pohon ke `root` naik/hilang: hanya subpohon `root` yang terdampak.
+        # Jarak node di luar subpohon tetap benar, jadi setiap node terdampak diberi
+        # jarak awal dari tetangga tak terdampak terbaik, lalu Dijkstra di dalam subpohon.
+        affected = {root}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for child in self._children.get(node, ()):
+                affected.add(child)
+                stack.append(child)
+        dist = self.dist
+        for node in affected:
+            del dist[node]
+            self._set_parent(node, None)
+
+        queue: List[Tuple[float, str]] = []
+        for node in affected:
+            best, via = math.inf, None
+            for neighbor, weight in self._neighbors(node):
+                if neighbor not in affected and dist.get(neighbor, math.inf) + weight < best:
+                    best, via = dist[neighbor] + weight, neighbor
+            if via is not None:
+                dist[node] = best
+                self._set_parent(node, via)
+                heapq.heappush(queue, (best, node))
+        self._propagate(queue, affected)
+        # Node terdampak yang tidak terjangkau lagi dikeluarkan dari pohon
+        for node in affected:
+            if node not in dist:
+                self.parent.pop(node, None)
+                self._children.pop(node, None)
+        self.last_repaired = len(affected)
+
+    def _propagate(self, queue: List[Tuple[float, str]], within: Optional[Set[str]]) -> int:
+        dist = self.dist
+        settled: Set[str] = set()
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if node in settled or cost > dist.get(node, math.inf):
+                continue
+            settled.add(node)
+            for neighbor, weight in self._neighbors(node):
+                if within is not None and neighbor not in within:
+                    continue
+                new_cost = cost + weight
+                if new_cost < dist.get(neighbor, math.inf):
+                    dist[neighbor] = new_cost
+                    self._set_parent(neighbor, node)
+                    heapq.heappush(queue, (new_cost, neighbor))
+        return len(settled)
@@ -0,0 +1,423 @@
+import math
+import random
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from main import ALGORITHMS, DistanceMatrix, Graph, _improve_tour
+
+_EPS = 1e-9
+
+
+class TruckRoute(NamedTuple):
+    truck: int  # nomor truk, mulai dari 1
+    stops: List[str]  # urutan SPBU yang dilayani (tanpa depot)
+    load: float  # total muatan (kL)
+    travel_minutes: float
+    duration_minutes: float  # perjalanan + waktu bongkar di setiap SPBU
+    path: List[str]  # jalur lengkap depot -> ... -> depot
+
+
+class FleetPlan(NamedTuple):
+    routes: List[TruckRoute]
+    travel_minutes: float  # total waktu perjalanan seluruh truk
+    unassigned: List[str]  # SPBU yang tidak bisa dilayani (muatan, shift, atau tidak terjangkau)
+
+
+class _Problem:
+    # Masalah VRP dalam bentuk indeks: 0 = depot, 1..n = SPBU. Dikirim ke worker apa adanya.
+    def __init__(self, cost: List[List[float]], demand: List[float], capacity: float, shift: float, service: float):
+        self.cost = cost
+        self.demand = demand
+        self.capacity = capacity
+        self.shift = shift
+        self.service = service
+
+    def travel(self, route: Sequence[int]) -> float:
+        if not route:
+            return 0.0
+        cost = self.cost
+        total = cost[0][route[0]] + cost[route[-1]][0]
+        for i in range(len(route) - 1):
+            total += cost[route[i]][route[i + 1]]
+        return total
+
+    def duration(self, route: Sequence[int]) -> float:
+        return self.travel(route) + self.service * len(route)
+
+    def load(self, route: Sequence[int]) -> float:
+        return sum(self.demand[i] for i in route)
+
+    def feasible(self, route: Sequence[int]) -> bool:
+        duration = self.duration(route)
+        return self.load(route) <= self.capacity + _EPS and duration <= self.shift + _EPS and duration < math.inf
+
+
+def _savings(problem: _Problem, customers: List[int], rng: Optional[random.Random]) -> List[List[int]]:
+    # Clarke-Wright paralel: mulai dari satu rute per SPBU, gabungkan pasangan ujung rute
+    # dengan penghematan terbesar selama muatan dan shift masih cukup. Graf dua arah, jadi
+    # rute boleh dibalik agar kedua ujung bertemu. `rng` memberi derau kecil pada nilai
+    # penghematan untuk titik awal yang berbeda di tiap worker.
+    cost = problem.cost
+    routes: Dict[int, List[int]] = {i: [i] for i in customers}
+    route_of = {i: i for i in customers}
+    load = {i: problem.demand[i] for i in customers}
+    duration = {i: problem.duration([i]) for i in customers}
+
+    pairs = []
+    for a, i in enumerate(customers):
+        for j in customers[a + 1:]:
+            saving = cost[0][i] + cost[0][j] - cost[i][j]
+            if rng is not None:
+                saving *= 1.0 + 0.2 * (rng.random() - 0.5)
+            pairs.append((saving, i, j))
+    pairs.sort(reverse=True)
+
+    for saving, i, j in pairs:
+        if saving <= 0:
+            break
+        ri, rj = route_of[i], route_of[j]
+        if ri == rj:
+            continue
+        first, second = routes[ri], routes[rj]
+        if i not in (first[0], first[-1]) or j not in (second[0], second[-1]):
+            continue
+        if load[ri] + load[rj] > problem.capacity + _EPS:
+            continue
+        merged_duration = duration[ri] + duration[rj] - cost[i][0] - cost[0][j] + cost[i][j]
+        if merged_duration > problem.shift + _EPS:
+            continue
+        if first[-1] != i:
+            first.reverse()
+        if second[0] != j:
+            second.reverse()
+        first.extend(second)
+        del routes[rj]
+        for node in second:
+            route_of[node] = ri
+        load[ri] += load.pop(rj)
+        duration[ri] = merged_duration
+        del duration[rj]
+    return list(routes.values())
+
+
+def _insertion_cost(problem: _Problem, route: List[int], position: int, node: int) -> float:
+    cost = problem.cost
+    before = route[position - 1] if position > 0 else 0
+    after = route[position] if position < len(route) else 0
+    return cost[before][node] + cost[node][after] - cost[before][after]
+
+
+def _cheapest_insertion(problem: _Problem, routes: List[List[int]], node: int) -> Optional[Tuple[float, int, int]]:
+    # (tambahan biaya, indeks rute, posisi) termurah yang masih memenuhi muatan dan shift
+    best = None
+    for r, route in enumerate(routes):
+        if problem.load(route) + problem.demand[node] > problem.capacity + _EPS:
+            continue
+        base = problem.duration(route) + problem.service
+        for position in range(len(route) + 1):
+            added = _insertion_cost(problem, route, position, node)
+            if base + added > problem.shift + _EPS:
+                continue
+            if best is None or added < best[0]:
+                best = (added, r, position)
+    return best
+
+
+def _relocate(problem: _Problem, routes: List[List[int]]) -> bool:
+    # Pindahkan satu SPBU ke posisi termurah di rute mana pun (termasuk rute asalnya)
+    cost = problem.cost
+    improved = False
+    for a in range(len(routes)):
+        position = 0
+        while position < len(routes[a]):
+            route = routes[a]
+            node = route[position]
+            before = route[position - 1] if position > 0 else 0
+            after = route[position + 1] if position + 1 < len(route) else 0
+            removed = cost[before][node] + cost[node][after] - cost[before][after]
+            shortened = route[:position] + route[position + 1:]
+            best_gain, best_target = _EPS, None
+            for b, other in enumerate(routes):
+                target = shortened if b == a else other
+                if b != a and problem.load(other) + problem.demand[node] > problem.capacity + _EPS:
+                    continue
+                base = problem.duration(target) + problem.service
+                for slot in range(len(target) + 1):
+                    if b == a and slot == position:
+                        continue
+                    added = _insertion_cost(problem, target, slot, node)
+                    if removed - added > best_gain and base + added <= problem.shift + _EPS:
+                        best_gain, best_target = removed - added, (b, slot)
+            if best_target is None:
+                position += 1
+                continue
+            b, slot = best_target
+            routes[a] = shortened
+            routes[b].insert(slot, node)
+            improved = True
+            if b != a:
+                continue  # posisi yang sama kini berisi SPBU berikutnya
+            position += 1
+    routes[:] = [route for route in routes if route]
+    return improved
+
+
+def _swap(problem: _Problem, routes: List[List[int]]) -> bool:
+    # Tukar dua SPBU dari rute yang berbeda
+    cost = problem.cost
+    improved = False
+    for a in range(len(routes)):
+        for b in range(a + 1, len(routes)):
+            first, second = routes[a], routes[b]
+            load_a, load_b = problem.load(first), problem.load(second)
+            for i in range(len(first)):
+                for j in range(len(second)):
+                    u, v = first[i], second[j]
+                    shift_load = problem.demand[v] - problem.demand[u]
+                    if load_a + shift_load > problem.capacity + _EPS or load_b - shift_load > problem.capacity + _EPS:
+                        continue
+                    pa, na = (first[i - 1] if i > 0 else 0), (first[i + 1] if i + 1 < len(first) else 0)
+                    pb, nb = (second[j - 1] if j > 0 else 0), (second[j + 1] if j + 1 < len(second) else 0)
+                    delta_a = cost[pa][v] + cost[v][na] - cost[pa][u] - cost[u][na]
+                    delta_b = cost[pb][u] + cost[u][nb] - cost[pb][v] - cost[v][nb]
+                    if delta_a + delta_b >= -_EPS:
+                        continue
+                    first[i], second[j] = v, u
+                    if problem.duration(first) > problem.shift + _EPS or problem.duration(second) > problem.shift + _EPS:
+                        first[i], second[j] = u, v
+                        continue
+                    load_a, load_b = load_a + shift_load, load_b - shift_load
+                    improved = True
+    return improved
+
+
+def _two_opt_star(problem: _Problem, routes: List[List[int]]) -> bool:
+    # Tukar ekor dua rute: A[:i] + B[j:] dan B[:j] + A[i:]
+    cost = problem.cost
+    improved = False
+    for a in range(len(routes)):
+        for b in range(a + 1, len(routes)):
+            first, second = routes[a], routes[b]
+            done = False
+            for i in range(len(first) + 1):
+                for j in range(len(second) + 1):
+                    if (i == 0 and j == 0) or (i == len(first) and j == len(second)):
+                        continue
+                    pa = first[i - 1] if i > 0 else 0
+                    na = first[i] if i < len(first) else 0
+                    pb = second[j - 1] if j > 0 else 0
+                    nb = second[j] if j < len(second) else 0
+                    delta = cost[pa][nb] + cost[pb][na] - cost[pa][na] - cost[pb][nb]
+                    if delta >= -_EPS:
+                        continue
+                    new_first, new_second = first[:i] + second[j:], second[:j] + first[i:]
+                    if problem.feasible(new_first) and problem.feasible(new_second):
+                        routes[a], routes[b] = new_first, new_second
+                        improved = done = True
+                        break
+                if done:
+                    break
+    routes[:] = [route for route in routes if route]
+    return improved
+
+
+def _intra_route(problem: _Problem, routes: List[List[int]], deadline: float) -> None:
+    # 2-opt/Or-opt di dalam satu rute memakai perbaikan milik solver multi tujuan
+    for r, route in enumerate(routes):
+        if len(route) > 2:
+            tour = _improve_tour(problem.cost, [0] + route + [0], deadline)
+            routes[r] = tour[1:-1]
+
+
+def _local_search(problem: _Problem, routes: List[List[int]], deadline: float) -> List[List[int]]:
+    while time.perf_counter() < deadline:
+        _intra_route(problem, routes, deadline)
+        if not (_relocate(problem, routes) | _swap(problem, routes) | _two_opt_star(problem, routes)):
+            break
+    return routes
+
+
+def _total(problem: _Problem, routes: List[List[int]]) -> float:
+    return sum(problem.travel(route) for route in routes)
+
+
+def _solve(
+    problem: _Problem, customers: List[int], max_routes: int, seed: int, time_budget_s: float, stall_limit: int = 200
+):
+    # Satu pencarian lengkap: savings -> batasi jumlah truk -> local search, lalu
+    # iterated local search (bongkar beberapa SPBU, sisipkan ulang termurah) hingga waktu
+    # habis atau `stall_limit` percobaan berturut-turut tidak lagi memperbaiki hasil.
+    deadline = time.perf_counter() + time_budget_s
+    rng = random.Random(seed)
+    routes = _savings(problem, customers, rng if seed else None)
+
+    unassigned: List[int] = []
+    routes.sort(key=problem.load, reverse=True)
+    while len(routes) > max_routes:
+        # Bubarkan rute terkecil dan sisipkan SPBU-nya ke rute lain jika muat
+        for node in routes.pop():
+            spot = _cheapest_insertion(problem, routes[:max_routes], node)
+            if spot is None:
+                unassigned.append(node)
+            else:
+                routes[spot[1]].insert(spot[2], node)
+
+    routes = _local_search(problem, routes, deadline)
+    best, best_cost = [list(route) for route in routes], _total(problem, routes)
+    visited = sum(len(route) for route in routes)
+    stalled = 0
+    while time.perf_counter() < deadline and visited > 1 and stalled < stall_limit:
+        stalled += 1
+        trial = [list(route) for route in best]
+        removed = []
+        for _ in range(max(2, visited // 10)):
+            r = rng.randrange(len(trial))
+            if trial[r]:
+                removed.append(trial[r].pop(rng.randrange(len(trial[r]))))
+        trial = [route for route in trial if route]
+        rng.shuffle(removed)
+        for node in removed:
+            spot = _cheapest_insertion(problem, trial, node)
+            if spot is not None:
+                trial[spot[1]].insert(spot[2], node)
+            elif len(trial) < max_routes and problem.feasible([node]):
+                trial.append([node])
+            else:
+                break
+        else:
+            trial = _local_search(problem, trial, deadline)
+            trial_cost = _total(problem, trial)
+            if trial_cost < best_cost - _EPS:
+                best, best_cost = trial, trial_cost
+                stalled = 0
+    return best_cost, best, unassigned
+
+
+def _solve_star(args):
+    return _solve(*args)
+
+
+def plan_fleet(
+    graph: Graph,
+    depot: str,
+    demands: Dict[str, float],
+    capacity: float,
+    trucks: Optional[int] = None,
+    shift_minutes: Optional[float] = None,
+    service_minutes: float = 0.0,
+    algorithm: str = "Dijkstra",
+    matrix: Optional[DistanceMatrix] = None,
+    time_budget_s: float = 5.0,
+    workers: Optional[int] = None,
+) -> FleetPlan:
+    # Rencana armada satu hari: setiap truk berangkat dari `depot`, melayani SPBU dengan
+    # total permintaan (kL) tidak melebihi `capacity`, dan kembali sebelum `shift_minutes`
+    # (waktu tempuh + `service_minutes` per SPBU). Konstruksi savings, lalu local search
+    # relocate/swap/2-opt* dijalankan paralel dari titik awal berbeda di `workers` proses
+    # sampai `time_budget_s`; hasil terbaik yang dipakai.
+    import multiprocessing
+    import os
+
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Algoritma '{algorithm}' tidak dikenal.")
+    if depot not in graph.nodes:
+        raise ValueError(f"Depot '{depot}' tidak ditemukan dalam graf.")
+    for name, demand in demands.items():
+        if name not in graph.nodes:
+            raise ValueError(f"Tujuan '{name}' tidak ditemukan dalam graf.")
+        if demand < 0:
+            raise ValueError(f"Permintaan '{name}' tidak boleh negatif.")
+    if capacity <= 0:
+        raise ValueError("Kapasitas truk harus lebih dari 0.")
+
+    names = [depot] + [name for name in demands if name != depot]
+    if matrix is None:
+        matrix = graph.distance_matrix(names, names, algorithm)
+    cost = [[matrix.cost(a, b) for b in names] for a in names]
+    demand = [0.0] + [float(demands[name]) for name in names[1:]]
+    shift = math.inf if shift_minutes is None else shift_minutes
+    problem = _Problem(cost, demand, capacity, shift, service_minutes)
+
+    customers = [i for i in range(1, len(names)) if problem.feasible([i])]
+    unassigned = [names[i] for i in range(1, len(names)) if not problem.feasible([i])]
+    max_routes = len(customers) if trucks is None else trucks
+    if not customers or max_routes <= 0:
+        return FleetPlan([], 0.0, unassigned + [names[i] for i in customers])
+
+    workers = workers if workers is not None else os.cpu_count() or 1
+    jobs = [(problem, customers, max_routes, seed, time_budget_s) for seed in range(max(1, workers))]
+    if workers <= 1:
+        results = [_solve_star(jobs[0])]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_solve_star, jobs)
+    # Utamakan SPBU terlayani terbanyak, lalu waktu tempuh terkecil; seri -> seed terkecil
+    total, routes, dropped = min(results, key=lambda result: (len(result[2]), result[0]))
+
+    plan_routes = []
+    for truck, route in enumerate(routes, start=1):
+        stops = [names[i] for i in route]
+        order = [depot] + stops + [depot]
+        path = [depot]
+        for i in range(len(order) - 1):
+            path.extend(matrix.path(order[i], order[i + 1])[1:])
+        plan_routes.append(
+            TruckRoute(truck, stops, problem.load(route), problem.travel(route), problem.duration(route), path)
+        )
+    return FleetPlan(plan_routes, total, unassigned + [names[i] for i in dropped])
+
+
+def format_plan(plan: FleetPlan) -> str:
+    lines = []
+    for route in plan.routes:
+        lines.append(
+            f"Truk {route.truck}: {len(route.stops)} SPBU, muatan {route.load:.1f} kL, "
+            f"perjalanan {route.travel_minutes:.1f} menit, total {route.duration_minutes:.1f} menit"
+        )
+        lines.append("  " + " -> ".join(route.stops))
+    lines.append(f"Total waktu perjalanan armada: {plan.travel_minutes:.1f} menit")
+    if plan.unassigned:
+        lines.append(f"Tidak terlayani: {', '.join(plan.unassigned)}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Rencana armada dari berkas permintaan CSV (kolom: spbu, demand_kl):
+    # python fleet.py permintaan.csv --capacity 16 --trucks 5 --shift 480 [--graph jaringan.bbmg]
+    import argparse
+    import csv
+
+    from loader import graph_path_from_env, load_graph
+
+    parser = argparse.ArgumentParser(description="Perencanaan rute armada truk tangki")
+    parser.add_argument("demands", help="CSV berisi kolom spbu dan demand_kl")
+    parser.add_argument("--graph", default=graph_path_from_env())
+    parser.add_argument("--depot", default="Depot IT Balikpapan")
+    parser.add_argument("--capacity", type=float, required=True, help="kapasitas truk (kL)")
+    parser.add_argument("--trucks", type=int)
+    parser.add_argument("--shift", type=float, help="panjang shift (menit)")
+    parser.add_argument("--service", type=float, default=0.0, help="waktu bongkar per SPBU (menit)")
+    parser.add_argument("--budget", type=float, default=5.0, help="batas waktu pencarian (detik)")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    fleet_graph = load_graph(args.graph)
+    with open(args.demands, newline="", encoding="utf-8") as handle:
+        orders = {row["spbu"]: float(row["demand_kl"]) for row in csv.DictReader(handle)}
+    try:
+        fleet_plan = plan_fleet(
+            fleet_graph,
+            args.depot,
+            orders,
+            args.capacity,
+            trucks=args.trucks,
+            shift_minutes=args.shift,
+            service_minutes=args.service,
+            time_budget_s=args.budget,
+            workers=args.workers,
+        )
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
+    print(format_plan(fleet_plan))
@@ -1,19 +1,41 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from main import create_example_graph, location_coords
+from loader import graph_path_from_env, load_graph
+from main import ALGORITHMS
+from render import MapLayer, pad_bounds, pixel_size
+
+# Label nama hanya digambar jika node yang terlihat tidak lebih dari ini
+LABEL_LIMIT = 200
+# Di atas jumlah ruas terlihat ini, lapisan dasar digambar sebagai satu gambar (Agg)
+# alih-alih satu create_line per ruas
+VECTOR_EDGE_LIMIT = 3000
+
 
 class MapGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Aplikasi Mapping Pengantar BBM - Graph Map GUI")
-        self.graph = create_example_graph()
-        self.locations = list(location_coords.keys())
-        # Scaling and canvas size setup
+        self.graph = load_graph(graph_path_from_env())
+        self.coords = self.graph.coordinates
+        self.locations = sorted(self.coords.keys())
+        # Geometri jaringan dibangun sekali; kanvas hanya menggambar bagian yang terlihat
+        self.layer = MapLayer.for_graph(self.graph)
         self.margin = 50
         self.size = 600
-        self.scale = 40  # scale factor for coords
+        self.view = pad_bounds(self.layer.bounds, 0.05)
+        self.path = []
+        self._base_image = None  # PhotoImage lapisan dasar harus tetap direferensikan
+        self._redraw_job = None
+        self._drag_from = None
         self.canvas = tk.Canvas(root, width=self.size + self.margin*2, height=self.size + self.margin*2, bg="white")
         self.canvas.pack()
+        # Zoom dengan roda mouse, geser dengan seret
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(e.x, e.y, 1.25 if e.delta > 0 else 0.8))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(e.x, e.y, 1.25))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(e.x, e.y, 0.8))
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<ButtonRelease-1>", self.end_drag)
 
         form = tk.Frame(root)
         form.pack(pady=5)
@@ -27,38 +49,119 @@ class MapGUI:
         self.combo_to.set(self.locations[1])
         self.combo_to.pack(side=tk.LEFT)
 
-        self.alg_option = ttk.Combobox(form, values=["Dijkstra", "A*"] , state="readonly", textvariable=self.selected_alg)
+        self.alg_option = ttk.Combobox(form, values=list(ALGORITHMS), state="readonly", textvariable=self.selected_alg)
         self.alg_option.pack(side=tk.LEFT, padx=10)
         btn = tk.Button(form, text="Cari Rute", command=self.find_route)
         btn.pack(side=tk.LEFT, padx=5)
-        
+        tk.Button(form, text="Reset Zoom", command=self.reset_view).pack(side=tk.LEFT)
+
         self.draw_map()
-        self.route_line = None
 
     def get_canvas_xy(self, coord):
-        # convert (x, y) to canvas XY
-        x, y = coord
-        # agar layout lebih proper, kayak map
-        cx = self.margin + x * self.scale
-        cy = self.margin + (self.size//self.scale - y) * self.scale
+        # Proyeksikan (lon, lat) ke kanvas sesuai tampilan saat ini, skala x dan y sama
+        min_x, min_y, max_x, max_y = self.view
+        scale = self.size / max(max_x - min_x, max_y - min_y)
+        cx = self.margin + (coord[0] - min_x) * scale
+        cy = self.margin + (max_y - coord[1]) * scale
         return cx, cy
 
+    def get_coord(self, cx, cy):
+        min_x, min_y, max_x, max_y = self.view
+        scale = self.size / max(max_x - min_x, max_y - min_y)
+        return min_x + (cx - self.margin) / scale, max_y - (cy - self.margin) / scale
+
     def draw_map(self):
-        self.canvas.delete("all")
-        # Draw edges
-        for n in self.locations:
-            for neighbor, _ in self.graph.edges[n]:
-                if self.locations.index(neighbor) > self.locations.index(n):
-                    x1, y1 = self.get_canvas_xy(location_coords[n])
-                    x2, y2 = self.get_canvas_xy(location_coords[neighbor])
-                    self.canvas.create_line(x1, y1, x2, y2, fill="#b0b0b0", width=2)
-        # Draw nodes
-        for node, coord in location_coords.items():
+        # Lapisan dasar: hanya ruas di dalam tampilan, disederhanakan per piksel layar
+        self.canvas.delete("base", "node")
+        width = self.size + self.margin * 2
+        min_x, min_y = self.get_coord(0, width)
+        max_x, max_y = self.get_coord(width, 0)
+        visible = (min_x, min_y, max_x, max_y)
+        edges = self.layer.visible_edges(visible, pixel_size(visible, width, width), VECTOR_EDGE_LIMIT)
+        if len(edges) > VECTOR_EDGE_LIMIT:
+            self._base_image = self.raster_image(visible, width)
+            self.canvas.create_image(0, 0, anchor=tk.NW, image=self._base_image, tags="base")
+        else:
+            self._base_image = None
+            for (a, b) in self.layer.lines(edges):
+                x1, y1 = self.get_canvas_xy(a)
+                x2, y2 = self.get_canvas_xy(b)
+                self.canvas.create_line(x1, y1, x2, y2, fill="#b0b0b0", width=2, tags="base")
+        self.canvas.tag_lower("base")
+        self.draw_nodes(visible)
+        self.draw_route()
+
+    def raster_image(self, visible, width):
+        # Tampilan kanvas berbentuk persegi dengan skala x dan y sama, jadi gambar
+        # width x width untuk batas `visible` jatuh tepat di atas kanvas
+        import base64
+        import io
+
+        from matplotlib.image import imsave
+
+        buffer = io.BytesIO()
+        imsave(buffer, self.layer.raster(width, width, linewidth=1.5, view=visible), format="png")
+        return tk.PhotoImage(data=base64.b64encode(buffer.getvalue()))
+
+    def draw_nodes(self, visible):
+        nodes = self.layer.visible_nodes(visible)
+        labelled = len(nodes) <= LABEL_LIMIT
+        for node, coord in nodes:
+            color = "blue" if node.startswith("SPBU") else ("green" if "Depot" in node else "gray")
+            if not labelled and color == "gray":
+                continue
             x, y = self.get_canvas_xy(coord)
-            color = "blue" if node.startswith("Pom") else ("green" if node == "Depot" else "gray")
-            r = 15
-            self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=color)
-            self.canvas.create_text(x, y, text=node, fill="white")
+            r = 15 if labelled else 4
+            self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=color, tags="node")
+            if labelled:
+                self.canvas.create_text(x, y, text=node, fill="white", tags="node")
+
+    def draw_route(self):
+        # Hanya rute yang digambar ulang setelah pencarian; jaringan dasar tidak disentuh
+        self.canvas.delete("route")
+        points = [self.get_canvas_xy(self.coords[node]) for node in self.path if self.coords.get(node)]
+        if len(points) > 1:
+            self.canvas.create_line(*[value for point in points for value in point], fill="#ff1c1c", width=5, tags="route")
+            self.canvas.tag_raise("node")
+
+    def schedule_redraw(self):
+        # Gabungkan zoom/geser beruntun menjadi satu gambar ulang
+        if self._redraw_job is not None:
+            self.root.after_cancel(self._redraw_job)
+        self._redraw_job = self.root.after(150, self._redraw)
+
+    def _redraw(self):
+        self._redraw_job = None
+        self.draw_map()
+
+    def zoom(self, cx, cy, factor):
+        x, y = self.get_coord(cx, cy)
+        min_x, min_y, max_x, max_y = self.view
+        self.view = (x - (x - min_x) / factor, y - (y - min_y) / factor, x + (max_x - x) / factor, y + (max_y - y) / factor)
+        self.canvas.scale("all", cx, cy, factor, factor)  # umpan balik instan sebelum digambar ulang
+        self.schedule_redraw()
+
+    def start_drag(self, event):
+        self._drag_from = (event.x, event.y)
+
+    def drag(self, event):
+        if self._drag_from is None:
+            return
+        dx, dy = event.x - self._drag_from[0], event.y - self._drag_from[1]
+        self.canvas.move("all", dx, dy)
+        x0, y0 = self.get_coord(0, 0)
+        x1, y1 = self.get_coord(dx, dy)
+        min_x, min_y, max_x, max_y = self.view
+        self.view = (min_x - (x1 - x0), min_y - (y1 - y0), max_x - (x1 - x0), max_y - (y1 - y0))
+        self._drag_from = (event.x, event.y)
+
+    def end_drag(self, _event):
+        self._drag_from = None
+        self.schedule_redraw()
+
+    def reset_view(self):
+        self.view = pad_bounds(self.layer.bounds, 0.05)
+        self.draw_map()
 
     def find_route(self):
         src = self.combo_from.get()
@@ -67,24 +170,9 @@ class MapGUI:
         if src == dst:
             messagebox.showinfo("Info", "Asal dan tujuan tidak boleh sama!")
             return
-        if alg == "Dijkstra":
-            _, path = self.graph.dijkstra(src, dst)
-        else:
-            _, path = self.graph.astar(src, dst)
-        self.draw_map()
-        if len(path)>1:
-            # highlight path
-            for i in range(len(path)-1):
-                x1, y1 = self.get_canvas_xy(location_coords[path[i]])
-                x2, y2 = self.get_canvas_xy(location_coords[path[i+1]])
-                self.canvas.create_line(x1, y1, x2, y2, fill="#ff1c1c", width=5)
-            # Bring nodes to front again
-            for node, coord in location_coords.items():
-                x, y = self.get_canvas_xy(coord)
-                color = "blue" if node.startswith("Pom") else ("green" if node == "Depot" else "gray")
-                r = 15
-                self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=color)
-                self.canvas.create_text(x, y, text=node, fill="white")
+        _, path = self.graph.route(src, dst, alg)
+        self.path = path
+        self.draw_route()
         # Show popup
         messagebox.showinfo("Hasil Rute", f"Rute terbaik: {path}")
 
@@ -92,4 +180,3 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = MapGUI(root)
     root.mainloop()
-
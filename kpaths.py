@@ -0,0 +1,255 @@
+import heapq
+import math
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from main import CompactGraph, Graph, SearchSpace, _edge_weight
+
+# "yen": k jalur loopless terpendek persis; "penalty": rute yang benar-benar berbeda
+KSP_MODES = ("yen", "penalty")
+# Pohon balik dari `end` hanya ditumbuhkan sampai jarak d(start, end) x faktor ini
+TREE_RADIUS_FACTOR = 1.5
+
+
+def k_shortest_paths(
+    graph: Graph,
+    start: str,
+    end: str,
+    k: int = 3,
+    mode: str = "yen",
+    penalty: float = 1.5,
+    max_overlap: float = 0.8,
+) -> List[Tuple[float, List[str]]]:
+    # Sampai `k` rute alternatif (biaya, jalur), terurut dari yang tercepat.
+    # Satu pohon jalur terpendek dari `end`, dibatasi TREE_RADIUS_FACTOR x d(start, end),
+    # dibangun sekali dan dipakai ulang: di dalam pohon jaraknya menjadi heuristik eksak
+    # untuk setiap pencarian spur/penalti, dan jika jalur pohon dari node spur tidak
+    # melanggar larangan, jalur itu langsung dipakai tanpa mencari. Di luar pohon
+    # heuristiknya jari-jari pohon (atau landmark ALT jika lebih besar).
+    # mode "yen": k jalur loopless terpendek (Yen). mode "penalty": setelah setiap rute,
+    # bobot ruasnya dikali `penalty` lalu dicari ulang; rute yang berbagi lebih dari
+    # `max_overlap` waktu tempuh dengan rute sebelumnya dilewati.
+    if mode not in KSP_MODES:
+        raise ValueError(f"Mode '{mode}' tidak dikenal.")
+    if mode == "penalty":
+        # Dengan penalti <= 1 jarak pohon dari `end` bukan lagi batas bawah bobot berpenalti
+        if penalty <= 1:
+            raise ValueError("Penalti harus lebih besar dari 1.")
+        if not 0 <= max_overlap <= 1:
+            raise ValueError("max_overlap harus di antara 0 dan 1.")
+    compact, source, target = graph._endpoints(start, end)
+    if k < 1 or source is None or target is None:
+        return [(0.0, [start])] if start == end and k >= 1 else []
+    if source == target:
+        return [(0.0, [start])]
+
+    tree = graph._acquire_space(compact)
+    space = graph._acquire_space(compact)
+    try:
+        radius = _reverse_ball(compact, tree, target, source, TREE_RADIUS_FACTOR)
+        tree_gen, tree_dist, tree_pred, tree_closed = tree.generation, tree.dist, tree.pred, tree.closed
+        if tree_closed[source] != tree_gen:
+            return []
+        outside: Callable[[int], float] = lambda node: radius
+        if graph.landmarks is not None and graph.landmarks.compact is compact:
+            landmark = graph.landmarks.heuristic(target)
+            outside = lambda node: max(radius, landmark(node))
+
+        def potential(node: int) -> float:
+            # Node di luar pohon berjarak minimal `radius` dari `end`
+            return tree_dist[node] if tree_closed[node] == tree_gen else outside(node)
+
+        def tree_path(node: int) -> Optional[List[int]]:
+            # Jalur pohon node -> end (pred pohon menunjuk ke arah `end`); None di luar pohon
+            if tree_closed[node] != tree_gen:
+                return None
+            path = [node]
+            while path[-1] != target:
+                path.append(tree_pred[path[-1]])
+            return path
+
+        def path_cost(path: List[int]) -> float:
+            return sum(_edge_weight(compact, path[i], path[i + 1]) for i in range(len(path) - 1))
+
+        if mode == "yen":
+            found = _yen_paths(compact, space, source, target, k, potential, tree_path, path_cost)
+        else:
+            found = _penalty_paths(compact, space, source, target, k, potential, path_cost, penalty, max_overlap)
+    finally:
+        graph._release_space(compact, space)
+        graph._release_space(compact, tree)
+    return [(cost, [compact.names[i] for i in path]) for cost, path in found]
+
+
+def _reverse_ball(graph: CompactGraph, space: SearchSpace, target: int, source: int, factor: float) -> float:
+    # Dijkstra dari `target` sampai `source` tertutup, lalu diteruskan hingga jarak
+    # d(source, target) x `factor`. Mengembalikan batas bawah jarak semua node yang belum
+    # tertutup (inf jika seluruh komponen sudah tertutup).
+    gen = space.reset()
+    dist, pred, stamp, closed = space.dist, space.pred, space.stamp, space.closed
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    dist[target] = 0.0
+    pred[target] = -1
+    stamp[target] = gen
+    queue: List[Tuple[float, int]] = [(0.0, target)]
+    limit = math.inf
+    while queue:
+        cost, node = queue[0]
+        if cost > limit:
+            return cost
+        heapq.heappop(queue)
+        if closed[node] == gen:
+            continue
+        closed[node] = gen
+        if node == source:
+            limit = cost * factor
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[i]
+            new_cost = cost + weights[i]
+            if stamp[neighbor] != gen or new_cost < dist[neighbor]:
+                stamp[neighbor] = gen
+                dist[neighbor] = new_cost
+                pred[neighbor] = node
+                heapq.heappush(queue, (new_cost, neighbor))
+    return math.inf
+
+
+def _restricted_search(
+    graph: CompactGraph,
+    space: SearchSpace,
+    source: int,
+    target: int,
+    potential: Callable[[int], float],
+    blocked_nodes: Set[int],
+    blocked_edges: Set[Tuple[int, int]],
+    bound: float = math.inf,
+    penalties: Optional[Dict[Tuple[int, int], float]] = None,
+) -> float:
+    # A* dengan node/edge yang dilarang dan bobot edge opsional dikalikan penalti
+    # (kunci (min, max) karena graf dua arah). `potential` harus batas bawah yang
+    # konsisten untuk bobot asli; melarang edge atau menaikkan bobot tidak merusaknya.
+    # Berhenti tanpa hasil (inf) begitu estimasi melewati `bound`.
+    gen = space.reset()
+    dist, pred, stamp, closed = space.dist, space.pred, space.stamp, space.closed
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    dist[source] = 0.0
+    pred[source] = -1
+    stamp[source] = gen
+    queue: List[Tuple[float, float, int]] = [(potential(source), 0.0, source)]
+    while queue:
+        estimate, cost, node = heapq.heappop(queue)
+        if estimate > bound:
+            return math.inf
+        if closed[node] == gen:
+            continue
+        closed[node] = gen
+        if node == target:
+            return cost
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[i]
+            if closed[neighbor] == gen or neighbor in blocked_nodes:
+                continue
+            if blocked_edges and (node, neighbor) in blocked_edges:
+                continue
+            remaining = potential(neighbor)
+            if remaining == math.inf:
+                continue
+            weight = weights[i]
+            if penalties:
+                weight *= penalties.get((node, neighbor) if node < neighbor else (neighbor, node), 1.0)
+            new_cost = cost + weight
+            if stamp[neighbor] != gen or new_cost < dist[neighbor]:
+                stamp[neighbor] = gen
+                dist[neighbor] = new_cost
+                pred[neighbor] = node
+                heapq.heappush(queue, (new_cost + remaining, new_cost, neighbor))
+    return math.inf
+
+
+def _yen_paths(
+    graph: CompactGraph,
+    space: SearchSpace,
+    source: int,
+    target: int,
+    k: int,
+    potential: Callable[[int], float],
+    tree_path: Callable[[int], Optional[List[int]]],
+    path_cost: Callable[[List[int]], float],
+) -> List[Tuple[float, List[int]]]:
+    first = tree_path(source)
+    accepted: List[Tuple[float, List[int]]] = [(path_cost(first), first)]
+    candidates: List[Tuple[float, List[int]]] = []
+    seen = {tuple(first)}
+    while len(accepted) < k:
+        _, previous = accepted[-1]
+        prefix_cost = 0.0
+        for j in range(len(previous) - 1):
+            spur, root = previous[j], previous[:j + 1]
+            blocked_nodes = set(root[:-1])
+            blocked_edges = {
+                (path[j], path[j + 1]) for _, path in accepted if len(path) > j + 1 and path[:j + 1] == root
+            }
+            # Batas atas: kandidat yang tidak mungkin masuk k teratas tidak perlu dicari
+            needed = k - len(accepted)
+            bound = math.inf
+            if len(candidates) >= needed:
+                bound = heapq.nsmallest(needed, candidates)[-1][0] - prefix_cost
+            spur_path: Optional[List[int]] = None
+            shortcut = tree_path(spur)
+            if (
+                shortcut is not None
+                and (shortcut[0], shortcut[1]) not in blocked_edges
+                and not blocked_nodes.intersection(shortcut)
+            ):
+                spur_path = shortcut
+            elif _restricted_search(graph, space, spur, target, potential, blocked_nodes, blocked_edges, bound) < math.inf:
+                spur_path = space.trace(target)
+            if spur_path is not None:
+                path = root[:-1] + spur_path
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (path_cost(path), path))
+            prefix_cost += _edge_weight(graph, previous[j], previous[j + 1])
+        if not candidates:
+            break
+        accepted.append(heapq.heappop(candidates))
+    return accepted
+
+
+def _penalty_paths(
+    graph: CompactGraph,
+    space: SearchSpace,
+    source: int,
+    target: int,
+    k: int,
+    potential: Callable[[int], float],
+    path_cost: Callable[[List[int]], float],
+    penalty: float,
+    max_overlap: float,
+) -> List[Tuple[float, List[int]]]:
+    penalties: Dict[Tuple[int, int], float] = {}
+    accepted: List[Tuple[float, List[int]]] = []
+    edge_sets: List[Dict[Tuple[int, int], float]] = []
+    for _ in range(3 * k):
+        if len(accepted) >= k:
+            break
+        if _restricted_search(graph, space, source, target, potential, set(), set(), math.inf, penalties) == math.inf:
+            break
+        path = space.trace(target)
+        edges = {}
+        for i in range(len(path) - 1):
+            key = (path[i], path[i + 1]) if path[i] < path[i + 1] else (path[i + 1], path[i])
+            edges[key] = _edge_weight(graph, path[i], path[i + 1])
+            penalties[key] = penalties.get(key, 1.0) * penalty
+        cost = path_cost(path)
+        # Bagian waktu tempuh yang sama dengan rute yang sudah diterima
+        # (rute yang persis sama selalu ditolak, juga saat max_overlap = 1)
+        distinct = all(
+            edges.keys() != other.keys()
+            and sum(weight for key, weight in edges.items() if key in other) <= max_overlap * cost
+            for other in edge_sets
+        )
+        if distinct:
+            accepted.append((cost, path))
+            edge_sets.append(edges)
+    accepted.sort(key=lambda item: item[0])
+    return accepted
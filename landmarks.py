@@ -0,0 +1,118 @@
+import math
+from array import array
+from typing import Callable, List
+
+from main import CompactGraph, Graph, SearchSpace, _tree_search
+
+LANDMARK_METHODS = ("farthest", "planar")
+
+
+class LandmarkTable:
+    # Batas bawah ALT (A*, Landmarks, Triangle inequality). Untuk setiap node disimpan
+    # jarak jalan ke K landmark dalam satu array float berurutan per node:
+    # distances[node * K + k]. Graf dua arah, jadi jarak "ke" dan "dari" landmark sama
+    # dan satu tabel cukup untuk kedua arah.
+    def __init__(self, compact: CompactGraph, landmarks: List[int], distances: array):
+        self.compact = compact
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph: Graph, count: int = 8, method: str = "farthest") -> "LandmarkTable":
+        if method not in LANDMARK_METHODS:
+            raise ValueError(f"Metode landmark '{method}' tidak dikenal.")
+        compact = graph.compact()
+        n = compact.num_nodes
+        count = min(count, n)
+        space = SearchSpace(n)
+        columns: List[array] = []
+
+        def distances_from(landmark: int) -> array:
+            _tree_search(compact, space, landmark, None)
+            gen = space.generation
+            return array("d", (space.dist[v] if space.closed[v] == gen else math.inf for v in range(n)))
+
+        if method == "planar":
+            landmarks = _planar_landmarks(compact, count)
+            columns = [distances_from(landmark) for landmark in landmarks]
+        else:
+            landmarks = []
+        # Farthest: landmark berikutnya adalah node terjauh (jarak jalan) dari landmark
+        # yang sudah dipilih; juga dipakai melengkapi pilihan planar yang kurang
+        nearest = array("d", [math.inf]) * n
+        for column in columns:
+            for v in range(n):
+                if column[v] < nearest[v]:
+                    nearest[v] = column[v]
+        while len(landmarks) < count:
+            if landmarks:
+                candidate = max(
+                    (v for v in range(n) if nearest[v] != math.inf and v not in landmarks),
+                    key=lambda v: nearest[v],
+                    default=None,
+                )
+                if candidate is None:
+                    # Komponen lain yang belum tersentuh landmark
+                    candidate = next(v for v in range(n) if nearest[v] == math.inf)
+            else:
+                # Mulai dari node terjauh relatif terhadap node 0
+                first = distances_from(0)
+                candidate = max(range(n), key=lambda v: first[v] if first[v] != math.inf else -1.0)
+            column = distances_from(candidate)
+            landmarks.append(candidate)
+            columns.append(column)
+            for v in range(n):
+                if column[v] < nearest[v]:
+                    nearest[v] = column[v]
+
+        k = len(landmarks)
+        distances = array("d", [math.inf]) * (n * k)
+        for j, column in enumerate(columns):
+            for v in range(n):
+                distances[v * k + j] = column[v]
+        return cls(compact, landmarks, distances)
+
+    def heuristic(self, goal: int) -> Callable[[int], float]:
+        # max_k |d(L_k, goal) - d(L_k, node)| adalah batas bawah jarak node -> goal
+        k = len(self.landmarks)
+        distances = self.distances
+        goal_row = [(j, distances[goal * k + j]) for j in range(k) if distances[goal * k + j] != math.inf]
+
+        def bound(node: int) -> float:
+            base = node * k
+            best = 0.0
+            for j, goal_distance in goal_row:
+                node_distance = distances[base + j]
+                if node_distance == math.inf:
+                    continue
+                diff = goal_distance - node_distance
+                if diff < 0.0:
+                    diff = -diff
+                if diff > best:
+                    best = diff
+            return best
+
+        return bound
+
+    def landmark_names(self) -> List[str]:
+        return [self.compact.names[i] for i in self.landmarks]
+
+
+def _planar_landmarks(compact: CompactGraph, count: int) -> List[int]:
+    # Bagi bidang di sekitar titik tengah koordinat menjadi `count` sektor sudut
+    # dan ambil node terjauh dari pusat di setiap sektor
+    points = [(v, compact.coordinate(v)) for v in range(compact.num_nodes)]
+    points = [(v, coord) for v, coord in points if coord is not None]
+    if not points:
+        return []
+    center_x = sum(coord[0] for _, coord in points) / len(points)
+    center_y = sum(coord[1] for _, coord in points) / len(points)
+    best: List[int] = [-1] * count
+    best_radius = [-1.0] * count
+    for v, (x, y) in points:
+        dx, dy = x - center_x, y - center_y
+        sector = int((math.atan2(dy, dx) + math.pi) / (2 * math.pi) * count) % count
+        radius = dx * dx + dy * dy
+        if radius > best_radius[sector]:
+            best[sector], best_radius[sector] = v, radius
+    return [v for v in best if v >= 0]
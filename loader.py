@@ -0,0 +1,605 @@
+import csv
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from main import AVERAGE_SPEED_KMPH, CompactGraph, Graph, create_example_graph, haversine_km
+
+# Kecepatan bawaan (km/jam) per kelas jalan OSM jika tag maxspeed tidak ada
+OSM_SPEEDS_KMPH: Dict[str, float] = {
+    "motorway": 80.0,
+    "trunk": 60.0,
+    "primary": 50.0,
+    "secondary": 40.0,
+    "tertiary": 35.0,
+    "unclassified": 30.0,
+    "residential": 25.0,
+    "living_street": 10.0,
+    "service": 15.0,
+}
+
+SNAPSHOT_SUFFIX = ".bbmg"
+_SNAPSHOT_MAGIC = b"BBMGRAF1"
+# magic, little-endian?, jumlah node, jumlah edge (satu arah), ukuran blob nama, kecepatan rata-rata
+_SNAPSHOT_HEADER = struct.Struct("<8s?7xqqqd")
+
+
+class _EdgeAccumulator:
+    # Penampung edge berbasis array selama pembacaan berkas, supaya jaringan besar tidak
+    # pernah disimpan sebagai dict/list tuple Python. build() langsung menghasilkan CSR.
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.coords = array("d")
+        self.sources = array("i")
+        self.targets = array("i")
+        self.weights = array("d")
+
+    def node(self, name: str, coord: Optional[Tuple[float, float]] = None) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.ids)
+            self.coords.extend((math.nan, math.nan))
+        if coord is not None:
+            self.coords[2 * node_id] = coord[0]
+            self.coords[2 * node_id + 1] = coord[1]
+        return node_id
+
+    def edge(self, from_node: int, to_node: int, weight: float) -> None:
+        self.sources.append(from_node)
+        self.targets.append(to_node)
+        self.weights.append(weight)
+
+    def build(self) -> CompactGraph:
+        # Urutan id mengikuti urutan nama, sama seperti CompactGraph.from_adjacency
+        names = sorted(self.ids)
+        n = len(names)
+        rank = array("i", [0]) * n
+        for new_id, name in enumerate(names):
+            rank[self.ids[name]] = new_id
+
+        degree = array("q", [0]) * (n + 1)
+        for u, v in zip(self.sources, self.targets):
+            degree[rank[u] + 1] += 1
+            degree[rank[v] + 1] += 1
+        offsets = array("q", [0]) * (n + 1)
+        for i in range(n):
+            offsets[i + 1] = offsets[i] + degree[i + 1]
+
+        cursor = array("q", offsets[:n])
+        targets = array("i", [0]) * offsets[n]
+        weights = array("d", [0.0]) * offsets[n]
+        for u, v, weight in zip(self.sources, self.targets, self.weights):
+            u, v = rank[u], rank[v]
+            # graf dua arah: setiap edge dimasukkan ke daftar kedua ujungnya
+            for a, b in ((u, v), (v, u)):
+                targets[cursor[a]] = b
+                weights[cursor[a]] = weight
+                cursor[a] += 1
+
+        coords = array("d", [math.nan]) * (2 * n)
+        for old_id in range(n):
+            new_id = rank[old_id]
+            coords[2 * new_id] = self.coords[2 * old_id]
+            coords[2 * new_id + 1] = self.coords[2 * old_id + 1]
+        return CompactGraph(names, offsets, targets, weights, coords)
+
+
+def _minutes(length_km: float, speed_kmph: float) -> float:
+    return length_km / speed_kmph * 60.0
+
+
+def _coord_key(coord: Tuple[float, float]) -> str:
+    return f"{coord[0]:.6f},{coord[1]:.6f}"
+
+
+# --- CSV -------------------------------------------------------------------------------
+
+
+def load_csv(
+    path: str, nodes_path: Optional[str] = None, average_speed_kmph: float = AVERAGE_SPEED_KMPH
+) -> Graph:
+    # Daftar edge dibaca baris per baris. Kolom wajib: from, to, lalu salah satu dari
+    # weight/minutes (menit) atau length_km. Kolom opsional from_lon, from_lat, to_lon,
+    # to_lat mengisi koordinat; berkas node terpisah (name, lon, lat) juga didukung.
+    acc = _EdgeAccumulator()
+    if nodes_path is not None:
+        with open(nodes_path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                acc.node(row["name"], (float(row["lon"]), float(row["lat"])))
+
+    with open(path, newline="", encoding="utf-8") as handle:
+        for line_no, row in enumerate(csv.DictReader(handle), start=2):
+            from_coord = _csv_coord(row, "from")
+            to_coord = _csv_coord(row, "to")
+            weight = row.get("weight") or row.get("minutes")
+            if weight:
+                minutes = float(weight)
+            elif row.get("length_km"):
+                minutes = _minutes(float(row["length_km"]), average_speed_kmph)
+            elif from_coord and to_coord:
+                minutes = _minutes(haversine_km(from_coord, to_coord), average_speed_kmph)
+            else:
+                raise ValueError(f"Baris {line_no} di '{path}' tidak memiliki bobot atau panjang jalan.")
+            acc.edge(acc.node(row["from"], from_coord), acc.node(row["to"], to_coord), minutes)
+    return Graph.from_compact(acc.build(), average_speed_kmph)
+
+
+def _csv_coord(row: Dict[str, str], prefix: str) -> Optional[Tuple[float, float]]:
+    lon, lat = row.get(f"{prefix}_lon"), row.get(f"{prefix}_lat")
+    if lon and lat:
+        return float(lon), float(lat)
+    return None
+
+
+# --- GeoJSON ---------------------------------------------------------------------------
+
+
+def load_geojson(path: str, average_speed_kmph: float = AVERAGE_SPEED_KMPH) -> Graph:
+    # Feature LineString/MultiLineString menjadi edge antara titik awal dan akhirnya
+    # (nama dari properti from/to jika ada, selain itu "lon,lat"). Bobot dari properti
+    # weight/minutes atau panjang garis pada kecepatan rata-rata. Feature Point dengan
+    # properti name menjadi node bernama (mis. SPBU).
+    acc = _EdgeAccumulator()
+    with open(path, encoding="utf-8") as handle:
+        for feature in _iter_geojson_features(handle):
+            geometry = feature.get("geometry") or {}
+            properties = feature.get("properties") or {}
+            kind = geometry.get("type")
+            if kind == "Point" and properties.get("name"):
+                lon, lat = geometry["coordinates"][:2]
+                acc.node(properties["name"], (lon, lat))
+                continue
+            if kind == "LineString":
+                lines = [geometry["coordinates"]]
+            elif kind == "MultiLineString":
+                lines = geometry["coordinates"]
+            else:
+                continue
+            for line in lines:
+                if len(line) < 2:
+                    continue
+                points = [(point[0], point[1]) for point in line]
+                weight = properties.get("weight", properties.get("minutes"))
+                if weight is None:
+                    length_km = sum(haversine_km(points[i], points[i + 1]) for i in range(len(points) - 1))
+                    weight = _minutes(length_km, average_speed_kmph)
+                start = acc.node(properties.get("from") or _coord_key(points[0]), points[0])
+                end = acc.node(properties.get("to") or _coord_key(points[-1]), points[-1])
+                acc.edge(start, end, float(weight))
+    return Graph.from_compact(acc.build(), average_speed_kmph)
+
+
+def _iter_geojson_features(handle, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    # Membaca array "features" satu objek demi satu dengan JSONDecoder.raw_decode,
+    # sehingga hanya satu feature (plus satu potongan berkas) yang ada di memori
+    decoder = json.JSONDecoder()
+    key = '"features"'
+    buffer = ""
+    while True:
+        found = buffer.find(key)
+        if found >= 0:
+            buffer = buffer[found + len(key):]
+            break
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            return
+        buffer = buffer[-len(key):] + chunk
+
+    position = 0
+    opened = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,:":
+            position += 1
+        if position >= len(buffer):
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                raise ValueError("Berkas GeoJSON terpotong.")
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        if not opened:
+            if buffer[position] != "[":
+                raise ValueError("Properti 'features' GeoJSON harus berupa array.")
+            opened = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            feature, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield feature
+        if position > chunk_size:
+            buffer, position = buffer[position:], 0
+
+
+# --- OpenStreetMap (XML dan PBF) -------------------------------------------------------
+
+
+def load_osm(path: str, average_speed_kmph: float = AVERAGE_SPEED_KMPH) -> Graph:
+    # Dua lintasan streaming atas berkas OSM (.osm/.xml atau .osm.pbf):
+    # 1) hitung pemakaian node oleh way jalan raya untuk menemukan simpang dan ujung jalan,
+    # 2) simpan koordinat node yang dipakai lalu pecah way menjadi edge antar-simpang.
+    # Graf ini dua arah, jadi tag oneway diabaikan. Diasumsikan node muncul sebelum way
+    # (urutan standar ekspor OSM).
+    elements = _iter_osm_pbf if path.lower().endswith(".pbf") else _iter_osm_xml
+
+    usage: Dict[int, int] = {}
+    for kind, *payload in elements(path, ways_only=True):
+        refs, tags = payload
+        if _osm_speed(tags) is None or len(refs) < 2:
+            continue
+        for ref in refs:
+            usage[ref] = usage.get(ref, 0) + 1
+        # ujung way selalu dihitung sebagai simpang
+        usage[refs[0]] += 1
+        usage[refs[-1]] += 1
+
+    acc = _EdgeAccumulator()
+    coords: Dict[int, Tuple[float, float]] = {}
+    for kind, *payload in elements(path, ways_only=False):
+        if kind == "node":
+            node_id, lon, lat = payload
+            if node_id in usage:
+                coords[node_id] = (lon, lat)
+            continue
+        refs, tags = payload
+        speed = _osm_speed(tags)
+        if speed is None or len(refs) < 2:
+            continue
+        start, length_km = refs[0], 0.0
+        for previous, ref in zip(refs, refs[1:]):
+            if previous not in coords or ref not in coords:
+                start, length_km = ref, 0.0
+                continue
+            length_km += haversine_km(coords[previous], coords[ref])
+            if usage[ref] >= 2 and ref != start:
+                acc.edge(
+                    acc.node(f"osm:{start}", coords[start]),
+                    acc.node(f"osm:{ref}", coords[ref]),
+                    _minutes(length_km, speed),
+                )
+                start, length_km = ref, 0.0
+    return Graph.from_compact(acc.build(), average_speed_kmph)
+
+
+def _osm_speed(tags: Dict[str, str]) -> Optional[float]:
+    highway = tags.get("highway")
+    if highway is None:
+        return None
+    base = OSM_SPEEDS_KMPH.get(highway[:-5] if highway.endswith("_link") else highway)
+    if base is None:
+        return None
+    limit = _maxspeed_kmph(tags.get("maxspeed", ""))
+    return limit if limit is not None and limit > 0 else base
+
+
+def _maxspeed_kmph(value: str) -> Optional[float]:
+    # Nilai tag maxspeed OSM -> km/jam: "50", "50 km/h", "20 mph", "10 knots", "walk".
+    # Nilai lain ("none", "signals", kode zona seperti "DE:urban") -> None, jadi kecepatan
+    # bawaan jenis jalan yang dipakai. Dari daftar "50;30" diambil nilai pertama.
+    value = value.split(";")[0].strip().lower()
+    if value == "walk":
+        return 5.0
+    number = ""
+    for ch in value:
+        if ch.isdigit() or (ch == "." and "." not in number):
+            number += ch
+        else:
+            break
+    if not number.strip("."):
+        return None
+    unit = value[len(number):].strip()
+    if unit == "mph":
+        return float(number) * 1.609344
+    if unit == "knots":
+        return float(number) * 1.852
+    if unit in ("", "km/h", "kmh", "kph"):
+        return float(number)
+    return None
+
+
+def _iter_osm_xml(path: str, ways_only: bool) -> Iterator[tuple]:
+    import xml.etree.ElementTree as ET
+
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+    depth = 1  # <osm> sudah dibuka; anak langsungnya (node/way/relation) ada di kedalaman 2
+    for event, elem in context:
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if elem.tag == "node" and depth == 1:
+            if not ways_only:
+                yield "node", int(elem.get("id")), float(elem.get("lon")), float(elem.get("lat"))
+        elif elem.tag == "way" and depth == 1:
+            refs = [int(nd.get("ref")) for nd in elem.iterfind("nd")]
+            tags = {tag.get("k"): tag.get("v") for tag in elem.iterfind("tag")}
+            yield "way", refs, tags
+        # buang setiap elemen tingkat atas yang sudah selesai (termasuk relation dan
+        # elemen lain yang tidak dipakai) agar memori tetap datar
+        if depth == 1:
+            root.clear()
+
+
+def _iter_osm_pbf(path: str, ways_only: bool) -> Iterator[tuple]:
+    # Pembaca OSM PBF minimal (tanpa dependensi): BlobHeader/Blob berisi PrimitiveBlock
+    # terkompresi zlib; node (biasa maupun DenseNodes) dan way dibaca dari setiap blok.
+    import zlib
+
+    with open(path, "rb") as handle:
+        while True:
+            size = handle.read(4)
+            if len(size) < 4:
+                return
+            header = _pb_fields(handle.read(struct.unpack(">I", size)[0]))
+            blob = _pb_fields(handle.read(header[3][0]))
+            if header[1][0] != b"OSMData":
+                continue
+            data = zlib.decompress(blob[3][0]) if 3 in blob else blob[1][0]
+            yield from _pbf_block(data, ways_only)
+
+
+def _pbf_block(data: bytes, ways_only: bool) -> Iterator[tuple]:
+    block = _pb_fields(data)
+    strings = [raw.decode("utf-8") for raw in _pb_fields(block[1][0]).get(1, [])]
+    granularity = block.get(17, [100])[0]
+    lat_offset = _int64(block.get(19, [0])[0])
+    lon_offset = _int64(block.get(20, [0])[0])
+
+    def degrees(offset: int, value: int) -> float:
+        return 1e-9 * (offset + granularity * value)
+
+    for raw_group in block.get(2, []):
+        group = _pb_fields(raw_group)
+        if not ways_only:
+            for raw_node in group.get(1, []):
+                node = _pb_fields(raw_node)
+                yield (
+                    "node",
+                    _zigzag(node[1][0]),
+                    degrees(lon_offset, _zigzag(node[9][0])),
+                    degrees(lat_offset, _zigzag(node[8][0])),
+                )
+            for raw_dense in group.get(2, []):
+                dense = _pb_fields(raw_dense)
+                node_id = lat = lon = 0
+                for d_id, d_lat, d_lon in zip(
+                    _pb_packed(dense.get(1, [])), _pb_packed(dense.get(8, [])), _pb_packed(dense.get(9, []))
+                ):
+                    node_id += _zigzag(d_id)
+                    lat += _zigzag(d_lat)
+                    lon += _zigzag(d_lon)
+                    yield "node", node_id, degrees(lon_offset, lon), degrees(lat_offset, lat)
+        for raw_way in group.get(3, []):
+            way = _pb_fields(raw_way)
+            keys = _pb_packed(way.get(2, []))
+            values = _pb_packed(way.get(3, []))
+            tags = {strings[k]: strings[v] for k, v in zip(keys, values)}
+            refs, ref = [], 0
+            for delta in _pb_packed(way.get(8, [])):
+                ref += _zigzag(delta)
+                refs.append(ref)
+            yield "way", refs, tags
+
+
+def _pb_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _pb_fields(data: bytes) -> Dict[int, List[Any]]:
+    # Dekode satu pesan protobuf menjadi {nomor field: [nilai]}; varint sebagai int,
+    # length-delimited sebagai bytes
+    fields: Dict[int, List[Any]] = {}
+    pos, end = 0, len(data)
+    while pos < end:
+        key, pos = _pb_varint(data, pos)
+        number, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = _pb_varint(data, pos)
+        elif wire == 2:
+            length, pos = _pb_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire == 1:
+            value, pos = struct.unpack_from("<q", data, pos)[0], pos + 8
+        elif wire == 5:
+            value, pos = struct.unpack_from("<i", data, pos)[0], pos + 4
+        else:
+            raise ValueError(f"Wire type protobuf {wire} tidak didukung.")
+        fields.setdefault(number, []).append(value)
+    return fields
+
+
+def _pb_packed(values: List[Any]) -> List[int]:
+    # Field repeated bisa datang packed (bytes) atau satu per satu (int)
+    result: List[int] = []
+    for value in values:
+        if isinstance(value, int):
+            result.append(value)
+            continue
+        pos = 0
+        while pos < len(value):
+            number, pos = _pb_varint(value, pos)
+            result.append(number)
+    return result
+
+
+def _zigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _int64(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+# --- Snapshot biner --------------------------------------------------------------------
+
+
+class _NameTable(Sequence):
+    # Nama node dibaca langsung dari blob UTF-8 snapshot. Nama tersimpan urut, dan urutan
+    # byte UTF-8 sama dengan urutan code point, jadi pencarian id cukup biner tanpa dict.
+    def __init__(self, blob: memoryview, offsets: memoryview):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._raw(index).decode("utf-8")
+
+    def _raw(self, index: int) -> bytes:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+    def find(self, name: str) -> Optional[int]:
+        key = name.encode("utf-8")
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._raw(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self._raw(low) == key:
+            return low
+        return None
+
+
+def _snapshot_sections(compact: CompactGraph) -> List[Tuple[str, Any]]:
+    names = [name.encode("utf-8") for name in compact.names]
+    name_offsets = array("q", [0])
+    for raw in names:
+        name_offsets.append(name_offsets[-1] + len(raw))
+    return [
+        ("q", array("q", compact.offsets)),
+        ("i", array("i", compact.targets)),
+        ("d", array("d", compact.weights)),
+        ("d", array("d", compact.coords)),
+        ("q", name_offsets),
+        ("B", b"".join(names)),
+    ]
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+def snapshot_size(compact: CompactGraph) -> int:
+    total = _SNAPSHOT_HEADER.size
+    for _, values in _snapshot_sections(compact):
+        size = len(memoryview(values).cast("B"))
+        total += size + _padding(size)
+    return total
+
+
+def write_snapshot(compact: CompactGraph, out: BinaryIO, average_speed_kmph: float = AVERAGE_SPEED_KMPH) -> None:
+    # Header diikuti array mentah yang masing-masing disejajarkan 8 byte, sehingga
+    # bisa langsung di-cast dari mmap tanpa salinan
+    sections = _snapshot_sections(compact)
+    out.write(
+        _SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC,
+            sys.byteorder == "little",
+            compact.num_nodes,
+            compact.num_edges,
+            len(sections[-1][1]),
+            average_speed_kmph,
+        )
+    )
+    for _, values in sections:
+        raw = memoryview(values).cast("B")
+        out.write(raw)
+        out.write(b"\0" * _padding(len(raw)))
+
+
+def save_snapshot(graph: Graph, path: str) -> None:
+    with open(path, "wb") as handle:
+        write_snapshot(graph.compact(), handle, graph.average_speed_kmph)
+
+
+def compact_from_buffer(buffer) -> Tuple[CompactGraph, float]:
+    # Bangun CompactGraph yang menunjuk langsung ke buffer snapshot (mmap, shared memory, bytes)
+    view = memoryview(buffer)
+    magic, little, num_nodes, num_edges, blob_size, speed = _SNAPSHOT_HEADER.unpack_from(view, 0)
+    if magic != _SNAPSHOT_MAGIC:
+        raise ValueError("Buffer bukan snapshot graf yang valid.")
+    if little != (sys.byteorder == "little"):
+        raise ValueError("Snapshot graf dibuat pada mesin dengan urutan byte berbeda.")
+
+    position = _SNAPSHOT_HEADER.size
+    arrays = []
+    for typecode, count in (
+        ("q", num_nodes + 1),
+        ("i", num_edges),
+        ("d", num_edges),
+        ("d", 2 * num_nodes),
+        ("q", num_nodes + 1),
+        ("B", blob_size),
+    ):
+        size = count * struct.calcsize(typecode)
+        arrays.append(view[position:position + size].cast(typecode))
+        position += size + _padding(size)
+    offsets, targets, weights, coords, name_offsets, blob = arrays
+    names = _NameTable(blob, name_offsets)
+    return CompactGraph(names, offsets, targets, weights, coords, lookup=names.find), speed
+
+
+def open_snapshot(path: str) -> Graph:
+    # Snapshot di-mmap read-only: tidak ada parsing, halaman dibaca OS saat dibutuhkan
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    compact, speed = compact_from_buffer(mapped)
+    return Graph.from_compact(compact, speed)
+
+
+def load_graph(path: Optional[str] = None, average_speed_kmph: float = AVERAGE_SPEED_KMPH) -> Graph:
+    # Pilih loader dari ekstensi berkas; tanpa path, pakai graf contoh Balikpapan
+    if not path:
+        return create_example_graph()
+    lowered = path.lower()
+    if lowered.endswith(SNAPSHOT_SUFFIX):
+        return open_snapshot(path)
+    if lowered.endswith(".csv"):
+        return load_csv(path, average_speed_kmph=average_speed_kmph)
+    if lowered.endswith((".geojson", ".json")):
+        return load_geojson(path, average_speed_kmph)
+    if lowered.endswith((".osm", ".xml", ".osm.pbf", ".pbf")):
+        return load_osm(path, average_speed_kmph)
+    raise ValueError(f"Format berkas graf '{path}' tidak dikenali.")
+
+
+def graph_path_from_env() -> Optional[str]:
+    # Front-end membaca lokasi jaringan dari variabel lingkungan BBM_GRAPH_PATH
+    return os.environ.get("BBM_GRAPH_PATH") or None
+
+
+if __name__ == "__main__":
+    # Konversi jaringan apa pun ke snapshot biner: python loader.py jalan.osm.pbf jalan.bbmg
+    if len(sys.argv) != 3:
+        print("Penggunaan: python loader.py <berkas masukan> <snapshot keluaran .bbmg>")
+        sys.exit(1)
+    source_graph = load_graph(sys.argv[1])
+    save_snapshot(source_graph, sys.argv[2])
+    print(f"Snapshot {sys.argv[2]} ditulis: {len(source_graph.nodes)} node.")
@@ -0,0 +1,240 @@
+import math
+import weakref
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from main import CompactGraph, Graph
+
+Bounds = Tuple[float, float, float, float]  # min_x (lon), min_y (lat), max_x, max_y
+
+# Jumlah sel grid per sumbu untuk memilih segmen yang terlihat
+GRID_CELLS = 128
+
+# Graf -> lapisan peta; entri hilang sendiri bersama grafnya
+_LAYERS: "weakref.WeakKeyDictionary[Graph, MapLayer]" = weakref.WeakKeyDictionary()
+
+
+class MapLayer:
+    # Geometri statis jaringan untuk digambar: satu segmen per ruas unik (edge paralel dan
+    # arah balik dibuang) dalam array float berurutan, ditambah batas peta. Dibangun sekali
+    # per bentuk ringkas graf dan dipakai bersama oleh Streamlit dan Tk; keduanya hanya
+    # menggambar ulang rute yang disorot di atasnya.
+    def __init__(self, compact: CompactGraph):
+        self.compact = compact
+        self.x1, self.y1, self.x2, self.y2 = array("d"), array("d"), array("d"), array("d")
+        self.sources, self.targets = array("i"), array("i")
+        for u in range(compact.num_nodes):
+            start = compact.coordinate(u)
+            if start is None:
+                continue
+            seen = set()
+            for i in range(compact.offsets[u], compact.offsets[u + 1]):
+                v = compact.targets[i]
+                if v <= u or v in seen:
+                    continue
+                seen.add(v)
+                end = compact.coordinate(v)
+                if end is None:
+                    continue
+                self.x1.append(start[0])
+                self.y1.append(start[1])
+                self.x2.append(end[0])
+                self.y2.append(end[1])
+                self.sources.append(u)
+                self.targets.append(v)
+        points = [coord for coord in map(compact.coordinate, range(compact.num_nodes)) if coord is not None]
+        if points:
+            self.bounds: Bounds = (
+                min(p[0] for p in points),
+                min(p[1] for p in points),
+                max(p[0] for p in points),
+                max(p[1] for p in points),
+            )
+        else:
+            self.bounds = (0.0, 0.0, 1.0, 1.0)
+        self._rasters: Dict[tuple, object] = {}
+        self._grid: Optional[Dict[Tuple[int, int], array]] = None
+
+    @classmethod
+    def for_graph(cls, graph: Graph) -> "MapLayer":
+        compact = graph.compact()
+        layer = _LAYERS.get(graph)
+        if layer is None or layer.compact is not compact:
+            layer = _LAYERS[graph] = cls(compact)
+        return layer
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def _cell_size(self) -> Tuple[float, float]:
+        min_x, min_y, max_x, max_y = self.bounds
+        return max((max_x - min_x) / GRID_CELLS, 1e-9), max((max_y - min_y) / GRID_CELLS, 1e-9)
+
+    def _buckets(self) -> Dict[Tuple[int, int], array]:
+        # Grid GRID_CELLS x GRID_CELLS di atas batas peta; setiap segmen masuk ke semua sel
+        # yang dilewati bbox-nya. Dibangun saat pertama kali tampilan diperbesar.
+        if self._grid is None:
+            width, height = self._cell_size()
+            min_x, min_y = self.bounds[0], self.bounds[1]
+            grid: Dict[Tuple[int, int], array] = {}
+            x1, y1, x2, y2 = self.x1, self.y1, self.x2, self.y2
+            for i in range(len(x1)):
+                ax, bx = sorted((int((x1[i] - min_x) / width), int((x2[i] - min_x) / width)))
+                ay, by = sorted((int((y1[i] - min_y) / height), int((y2[i] - min_y) / height)))
+                for cx in range(ax, bx + 1):
+                    for cy in range(ay, by + 1):
+                        bucket = grid.get((cx, cy))
+                        if bucket is None:
+                            bucket = grid[(cx, cy)] = array("i")
+                        bucket.append(i)
+            self._grid = grid
+        return self._grid
+
+    def _candidates(self, view: Bounds) -> Sequence[int]:
+        # Segmen yang mungkin terlihat: semua jika tampilan mencakup sebagian besar peta,
+        # selain itu hanya isi sel grid yang bersinggungan dengan tampilan
+        min_x, min_y, max_x, max_y = self.bounds
+        width, height = self._cell_size()
+        lo_x = max(0, int((view[0] - min_x) / width))
+        lo_y = max(0, int((view[1] - min_y) / height))
+        hi_x = min(GRID_CELLS, int((view[2] - min_x) / width))
+        hi_y = min(GRID_CELLS, int((view[3] - min_y) / height))
+        if hi_x < lo_x or hi_y < lo_y:
+            return []
+        if (hi_x - lo_x + 1) * (hi_y - lo_y + 1) > GRID_CELLS * GRID_CELLS // 2:
+            return range(len(self.x1))
+        grid = self._buckets()
+        found = set()
+        for cx in range(lo_x, hi_x + 1):
+            for cy in range(lo_y, hi_y + 1):
+                bucket = grid.get((cx, cy))
+                if bucket is not None:
+                    found.update(bucket)
+        return sorted(found)
+
+    def visible_edges(
+        self, view: Optional[Bounds] = None, pixel_size: float = 0.0, limit: Optional[int] = None
+    ) -> List[int]:
+        # Indeks segmen yang perlu digambar untuk tampilan `view`: segmen di luar tampilan
+        # dibuang, dan pada tampilan jauh (pixel_size besar) ujung segmen dibulatkan ke
+        # grid piksel sehingga segmen yang jatuh ke piksel yang sama hanya digambar sekali.
+        # Dengan `limit`, berhenti begitu lebih dari `limit` segmen terpilih (pemanggil
+        # beralih ke raster() dan tidak perlu daftar lengkapnya).
+        x1, y1, x2, y2 = self.x1, self.y1, self.x2, self.y2
+        if view is None:
+            view = self.bounds
+        min_x, min_y, max_x, max_y = view
+        chosen: List[int] = []
+        occupied = set()
+        for i in self._candidates(view):
+            ax, ay, bx, by = x1[i], y1[i], x2[i], y2[i]
+            if max(ax, bx) < min_x or min(ax, bx) > max_x or max(ay, by) < min_y or min(ay, by) > max_y:
+                continue
+            if pixel_size > 0:
+                key = (
+                    round(ax / pixel_size),
+                    round(ay / pixel_size),
+                    round(bx / pixel_size),
+                    round(by / pixel_size),
+                )
+                if key[:2] > key[2:]:
+                    key = key[2:] + key[:2]
+                if key in occupied:
+                    continue
+                occupied.add(key)
+            chosen.append(i)
+            if limit is not None and len(chosen) > limit:
+                break
+        return chosen
+
+    def lines(self, edges: Sequence[int]) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        x1, y1, x2, y2 = self.x1, self.y1, self.x2, self.y2
+        return [((x1[i], y1[i]), (x2[i], y2[i])) for i in edges]
+
+    def endpoints(self, edge: int) -> Tuple[str, str]:
+        names = self.compact.names
+        return names[self.sources[edge]], names[self.targets[edge]]
+
+    def visible_nodes(self, view: Optional[Bounds] = None) -> List[Tuple[str, Tuple[float, float]]]:
+        min_x, min_y, max_x, max_y = view or self.bounds
+        compact = self.compact
+        found = []
+        for node in range(compact.num_nodes):
+            coord = compact.coordinate(node)
+            if coord is not None and min_x <= coord[0] <= max_x and min_y <= coord[1] <= max_y:
+                found.append((compact.names[node], coord))
+        return found
+
+    def raster(
+        self, width: int, height: int, color: str = "#b0b0b0", linewidth: float = 1.0, view: Optional[Bounds] = None
+    ):
+        # Lapisan dasar jaringan sebagai gambar RGBA (array NumPy) selebar `width` x `height`
+        # piksel. Tanpa `view` gambar mencakup extent() untuk ax.imshow(..., extent=layer.extent())
+        # dan dirender sekali per ukuran/gaya; dengan `view` (mis. zoom di Tk) gambar persis
+        # mengisi batas tersebut dan dirender setiap kali.
+        key = (width, height, color, linewidth)
+        image = self._rasters.get(key) if view is None else None
+        if image is None:
+            import numpy as np
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            dpi = 100
+            figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+            FigureCanvasAgg(figure)
+            ax = figure.add_axes((0, 0, 1, 1))
+            ax.set_axis_off()
+            min_x, min_y, max_x, max_y = view or self.extent_bounds()
+            ax.set_xlim(min_x, max_x)
+            ax.set_ylim(min_y, max_y)
+            # Satu Line2D dengan pemisah NaN jauh lebih cepat di Agg daripada LineCollection
+            # berisi ratusan ribu segmen; pemilihan segmen dilakukan vektor dengan NumPy
+            x1, y1, x2, y2 = (
+                np.frombuffer(values, dtype=np.float64) for values in (self.x1, self.y1, self.x2, self.y2)
+            )
+            inside = ~(
+                (np.maximum(x1, x2) < min_x) | (np.minimum(x1, x2) > max_x)
+                | (np.maximum(y1, y2) < min_y) | (np.minimum(y1, y2) > max_y)
+            )
+            count = int(inside.sum())
+            xs, ys = np.full(3 * count, np.nan), np.full(3 * count, np.nan)
+            xs[0::3], xs[1::3] = x1[inside], x2[inside]
+            ys[0::3], ys[1::3] = y1[inside], y2[inside]
+            ax.plot(xs, ys, color=color, linewidth=linewidth, solid_capstyle="round")
+            figure.canvas.draw()
+            image = np.asarray(figure.canvas.buffer_rgba()).copy()
+            if view is None:
+                self._rasters[key] = image
+        return image
+
+    def extent_bounds(self, margin: float = 0.05) -> Bounds:
+        return pad_bounds(self.bounds, margin)
+
+    def extent(self, margin: float = 0.05) -> Tuple[float, float, float, float]:
+        # Urutan (left, right, bottom, top) seperti yang diminta imshow
+        min_x, min_y, max_x, max_y = self.extent_bounds(margin)
+        return min_x, max_x, min_y, max_y
+
+
+def pad_bounds(bounds: Bounds, margin: float = 0.05) -> Bounds:
+    min_x, min_y, max_x, max_y = bounds
+    pad_x = max((max_x - min_x) * margin, 1e-4)
+    pad_y = max((max_y - min_y) * margin, 1e-4)
+    return min_x - pad_x, min_y - pad_y, max_x + pad_x, max_y + pad_y
+
+
+def path_bounds(coords: Sequence[Tuple[float, float]]) -> Optional[Bounds]:
+    if not coords:
+        return None
+    return (
+        min(c[0] for c in coords),
+        min(c[1] for c in coords),
+        max(c[0] for c in coords),
+        max(c[1] for c in coords),
+    )
+
+
+def pixel_size(view: Bounds, width: int, height: int) -> float:
+    # Ukuran satu piksel layar dalam derajat; dipakai untuk penyederhanaan per zoom
+    min_x, min_y, max_x, max_y = view
+    return max((max_x - min_x) / max(width, 1), (max_y - min_y) / max(height, 1), 0.0) or math.ulp(1.0)
@@ -0,0 +1,312 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from main import CompactGraph, Graph
+
+KM_PER_DEGREE = 6371.0 * math.pi / 180.0
+
+
+class EdgeSnap(NamedTuple):
+    from_node: str
+    to_node: str
+    weight: float
+    fraction: float  # posisi titik proyeksi di ruas: 0 = from_node, 1 = to_node
+    distance_km: float
+    point: Tuple[float, float]  # (lon, lat) titik terdekat pada ruas
+
+
+class SpatialIndex:
+    # Indeks grid (bucket) atas koordinat node untuk mencari node/ruas terdekat dari
+    # posisi GPS mentah. Koordinat diproyeksikan equirectangular ke bidang km di sekitar
+    # lintang acuan; semua jarak yang dikembalikan adalah jarak di bidang itu
+    # (selisihnya dengan haversine dapat diabaikan pada skala kota).
+    # Dibuat lewat Graph.spatial_index(); add_node dengan koordinat langsung dimasukkan.
+    def __init__(self, graph: Graph, cell_km: float, reference_lat: float):
+        self.graph = graph
+        self.cell_km = cell_km
+        self.reference_lat = reference_lat
+        self._x_scale = KM_PER_DEGREE * math.cos(math.radians(reference_lat))
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        self._points: Dict[str, Tuple[float, float, Tuple[int, int]]] = {}
+        self._bounds: Optional[List[int]] = None  # min_cx, min_cy, max_cx, max_cy
+        self._arrays = None  # array NumPy terurut per sel untuk nearest_many
+        self._segments: Dict[Tuple[int, int], List[int]] = {}
+        self._segment_bounds = [0, 0, 0, 0]
+        self._segment_graph: Optional[CompactGraph] = None
+
+    @classmethod
+    def build(cls, graph: Graph, nodes_per_cell: float = 2.0) -> "SpatialIndex":
+        coords = list(graph.coordinates.items())
+        if coords:
+            reference_lat = sum(lat for _, (_, lat) in coords) / len(coords)
+        else:
+            reference_lat = 0.0
+        x_scale = KM_PER_DEGREE * math.cos(math.radians(reference_lat))
+        cell_km = 0.25
+        if len(coords) > 1:
+            width = (max(lon for _, (lon, _) in coords) - min(lon for _, (lon, _) in coords)) * x_scale
+            height = (max(lat for _, (_, lat) in coords) - min(lat for _, (_, lat) in coords)) * KM_PER_DEGREE
+            area = max(width, 1e-3) * max(height, 1e-3)
+            cell_km = max(0.01, math.sqrt(area * nodes_per_cell / len(coords)))
+        index = cls(graph, cell_km, reference_lat)
+        for name, coord in coords:
+            index.insert(name, coord)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def project(self, coord: Tuple[float, float]) -> Tuple[float, float]:
+        return coord[0] * self._x_scale, coord[1] * KM_PER_DEGREE
+
+    def unproject(self, x: float, y: float) -> Tuple[float, float]:
+        return x / self._x_scale, y / KM_PER_DEGREE
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_km), math.floor(y / self.cell_km)
+
+    def insert(self, name: str, coord: Tuple[float, float]) -> None:
+        # Node baru atau koordinat node yang berubah
+        old = self._points.get(name)
+        if old is not None:
+            self._cells[old[2]].remove(name)
+        x, y = self.project(coord)
+        cell = self._cell(x, y)
+        self._points[name] = (x, y, cell)
+        self._cells.setdefault(cell, []).append(name)
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            bounds = self._bounds
+            bounds[0], bounds[1] = min(bounds[0], cell[0]), min(bounds[1], cell[1])
+            bounds[2], bounds[3] = max(bounds[2], cell[0]), max(bounds[3], cell[1])
+        self._arrays = None
+
+    def _rings(
+        self, cell: Tuple[int, int], bounds: Sequence[int], occupied: Dict[Tuple[int, int], list]
+    ) -> Iterable[Tuple[int, List[Tuple[int, int]]]]:
+        # (radius, sel) cincin demi cincin di sekitar `cell`, hanya sel di dalam batas
+        # terisi. Dimulai dari cincin pertama yang menyentuh batas, dan begitu satu cincin
+        # lebih besar dari jumlah sel terisi, sisa sel terisi dipindai langsung (dikelompokkan
+        # per cincin) sehingga posisi jauh di luar jaringan, mis. GPS (0, 0), tetap cepat.
+        min_cx, min_cy, max_cx, max_cy = bounds
+        cx, cy = cell
+        first = max(min_cx - cx, cx - max_cx, min_cy - cy, cy - max_cy, 0)
+        last = max(cx - min_cx, max_cx - cx, cy - min_cy, max_cy - cy, 0)
+        for radius in range(first, last + 1):
+            if 8 * radius > len(occupied):
+                rest: Dict[int, List[Tuple[int, int]]] = {}
+                for other in occupied:
+                    ring = max(abs(other[0] - cx), abs(other[1] - cy))
+                    if ring >= radius:
+                        rest.setdefault(ring, []).append(other)
+                for ring in sorted(rest):
+                    yield ring, rest[ring]
+                return
+            yield radius, [
+                c for c in self._ring(cell, radius) if min_cx <= c[0] <= max_cx and min_cy <= c[1] <= max_cy
+            ]
+
+    def _ring(self, cell: Tuple[int, int], radius: int) -> Iterable[Tuple[int, int]]:
+        cx, cy = cell
+        if radius == 0:
+            yield cell
+            return
+        for dx in range(-radius, radius + 1):
+            yield cx + dx, cy - radius
+            yield cx + dx, cy + radius
+        for dy in range(-radius + 1, radius):
+            yield cx - radius, cy + dy
+            yield cx + radius, cy + dy
+
+    def nearest(self, coord: Tuple[float, float], k: int = 1) -> List[Tuple[str, float]]:
+        # k node terdekat sebagai (nama, km), terurut dari yang terdekat
+        if not self._points or k < 1:
+            return []
+        x, y = self.project(coord)
+        cell = self._cell(x, y)
+        best: List[Tuple[float, str]] = []  # max-heap (jarak negatif) berukuran k
+        for radius, ring_cells in self._rings(cell, self._bounds, self._cells):
+            for ring_cell in ring_cells:
+                for name in self._cells.get(ring_cell, ()):
+                    px, py, _ = self._points[name]
+                    distance = math.hypot(px - x, py - y)
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, name))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, name))
+            # Node di luar cincin 0..radius berjarak minimal radius * cell_km
+            if len(best) == k and -best[0][0] <= radius * self.cell_km:
+                break
+        return [(name, -negative) for negative, name in sorted(best, reverse=True)]
+
+    def within(self, coord: Tuple[float, float], radius_km: float) -> List[Tuple[str, float]]:
+        # Semua node dalam radius, terurut dari yang terdekat
+        if not self._points:
+            return []
+        x, y = self.project(coord)
+        cx, cy = self._cell(x, y)
+        reach = math.ceil(radius_km / self.cell_km)
+        if (2 * reach + 1) ** 2 > len(self._cells):
+            cells: Iterable[Tuple[int, int]] = [c for c in self._cells if abs(c[0] - cx) <= reach and abs(c[1] - cy) <= reach]
+        else:
+            cells = [(cx + dx, cy + dy) for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)]
+        found = []
+        for cell in cells:
+            for name in self._cells.get(cell, ()):
+                px, py, _ = self._points[name]
+                distance = math.hypot(px - x, py - y)
+                if distance <= radius_km:
+                    found.append((distance, name))
+        found.sort()
+        return [(name, distance) for distance, name in found]
+
+    def nearest_many(self, coords: Sequence[Tuple[float, float]], k: int = 1) -> List[List[Tuple[str, float]]]:
+        # Versi batch dari nearest(). Dengan NumPy semua posisi diproses sekaligus: kandidat
+        # diambil dari blok sel selebar `reach` di sekitar tiap posisi, dan hasilnya pasti
+        # benar jika jarak ke-k tidak melebihi reach * cell_km; posisi lain (jarang) dicari
+        # ulang satu per satu.
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.nearest(coord, k) for coord in coords]
+        if len(coords) == 0 or not self._points or k < 1:
+            return [[] for _ in coords]
+
+        names, keys, xs, ys = self._sorted_arrays()
+        query = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        # Urutkan posisi per sel agar pencarian biner ke kunci sel berjalan berurutan
+        raw_x, raw_y = query[:, 0] * self._x_scale, query[:, 1] * KM_PER_DEGREE
+        by_cell = np.argsort(_cell_keys(np.floor(raw_x / self.cell_km).astype(np.int64),
+                                        np.floor(raw_y / self.cell_km).astype(np.int64)), kind="stable")
+        query = query[by_cell]
+        qx, qy = query[:, 0] * self._x_scale, query[:, 1] * KM_PER_DEGREE
+        qcx = np.floor(qx / self.cell_km).astype(np.int64)
+        qcy = np.floor(qy / self.cell_km).astype(np.int64)
+
+        reach = 1 + int(math.sqrt(k / 2))
+        starts, counts = [], []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                cell_keys = _cell_keys(qcx + dx, qcy + dy)
+                start = np.searchsorted(keys, cell_keys, side="left")
+                starts.append(start)
+                counts.append(np.searchsorted(keys, cell_keys, side="right") - start)
+        width = max(int(sum(counts).max()), k)
+        rows = np.arange(len(query))
+        candidates = np.full((len(query), width), -1, dtype=np.int64)
+        filled = np.zeros(len(query), dtype=np.int64)
+        for start, count in zip(starts, counts):
+            for step in range(int(count.max())):
+                mask = step < count
+                candidates[rows[mask], filled[mask] + step] = start[mask] + step
+            filled += count
+
+        valid = candidates >= 0
+        safe = np.where(valid, candidates, 0)
+        distances = np.where(valid, np.hypot(xs[safe] - qx[:, None], ys[safe] - qy[:, None]), np.inf)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        best = np.take_along_axis(distances, order, axis=1)
+        exact = best[:, k - 1] <= reach * self.cell_km
+
+        picked = np.take_along_axis(safe, order, axis=1).tolist()
+        results: List[List[Tuple[str, float]]] = [[] for _ in range(len(query))]
+        rows_in_input = by_cell.tolist()
+        for i, (exact_row, picked_row, best_row) in enumerate(zip(exact.tolist(), picked, best.tolist())):
+            if exact_row:
+                found = [(names[j], distance) for j, distance in zip(picked_row, best_row)]
+            else:
+                found = self.nearest((float(query[i, 0]), float(query[i, 1])), k)
+            results[rows_in_input[i]] = found
+        return results
+
+    def _sorted_arrays(self):
+        import numpy as np
+
+        if self._arrays is None:
+            names = list(self._points)
+            xs = np.fromiter((self._points[name][0] for name in names), dtype=np.float64, count=len(names))
+            ys = np.fromiter((self._points[name][1] for name in names), dtype=np.float64, count=len(names))
+            keys = _cell_keys(np.floor(xs / self.cell_km).astype(np.int64), np.floor(ys / self.cell_km).astype(np.int64))
+            order = np.argsort(keys, kind="stable")
+            self._arrays = ([names[i] for i in order], keys[order], xs[order], ys[order])
+        return self._arrays
+
+    def snap_to_edge(self, coord: Tuple[float, float]) -> Optional[EdgeSnap]:
+        # Ruas terdekat dari posisi GPS beserta titik proyeksinya di ruas tersebut
+        compact = self._segment_index()
+        if not self._segments:
+            return None
+        x, y = self.project(coord)
+        cell = self._cell(x, y)
+        best: Optional[Tuple[float, int, float]] = None
+        seen = set()
+        for radius, ring_cells in self._rings(cell, self._segment_bounds, self._segments):
+            for ring_cell in ring_cells:
+                for edge in self._segments.get(ring_cell, ()):
+                    if edge in seen:
+                        continue
+                    seen.add(edge)
+                    distance, fraction = self._segment_distance(compact, edge, x, y)
+                    if best is None or distance < best[0]:
+                        best = (distance, edge, fraction)
+            if best is not None and best[0] <= radius * self.cell_km:
+                break
+        distance, edge, fraction = best
+        u, v = self._edge_ends(compact, edge)
+        ux, uy = self.project(compact.coordinate(u))
+        vx, vy = self.project(compact.coordinate(v))
+        point = self.unproject(ux + (vx - ux) * fraction, uy + (vy - uy) * fraction)
+        return EdgeSnap(compact.names[u], compact.names[v], compact.weights[edge], fraction, distance, point)
+
+    def _edge_ends(self, compact: CompactGraph, edge: int) -> Tuple[int, int]:
+        # Indeks edge CSR -> (asal, tujuan); asal dicari biner di offsets
+        import bisect
+
+        return bisect.bisect_right(compact.offsets, edge) - 1, compact.targets[edge]
+
+    def _segment_distance(self, compact: CompactGraph, edge: int, x: float, y: float) -> Tuple[float, float]:
+        u, v = self._edge_ends(compact, edge)
+        ux, uy = self.project(compact.coordinate(u))
+        vx, vy = self.project(compact.coordinate(v))
+        dx, dy = vx - ux, vy - uy
+        length = dx * dx + dy * dy
+        fraction = 0.0 if length == 0 else min(1.0, max(0.0, ((x - ux) * dx + (y - uy) * dy) / length))
+        return math.hypot(ux + dx * fraction - x, uy + dy * fraction - y), fraction
+
+    def _segment_index(self) -> CompactGraph:
+        # Grid ruas dibangun ulang dari CSR hanya jika graf berubah sejak terakhir dipakai.
+        # Setiap ruas (satu arah per pasangan) dimasukkan ke semua sel yang dilewati bbox-nya.
+        compact = self.graph.compact()
+        if self._segment_graph is compact:
+            return compact
+        segments: Dict[Tuple[int, int], List[int]] = {}
+        bounds = [math.inf, math.inf, -math.inf, -math.inf]
+        for u in range(compact.num_nodes):
+            start = compact.coordinate(u)
+            if start is None:
+                continue
+            for edge in range(compact.offsets[u], compact.offsets[u + 1]):
+                v = compact.targets[edge]
+                end = compact.coordinate(v)
+                if v < u or end is None:
+                    continue
+                # Dari edge paralel cukup yang paling ringan
+                if any(compact.targets[i] == v and compact.weights[i] < compact.weights[edge]
+                       for i in range(compact.offsets[u], compact.offsets[u + 1])):
+                    continue
+                (ax, ay), (bx, by) = self._cell(*self.project(start)), self._cell(*self.project(end))
+                for cx in range(min(ax, bx), max(ax, bx) + 1):
+                    for cy in range(min(ay, by), max(ay, by) + 1):
+                        segments.setdefault((cx, cy), []).append(edge)
+                bounds = [min(bounds[0], ax, bx), min(bounds[1], ay, by), max(bounds[2], ax, bx), max(bounds[3], ay, by)]
+        self._segments = segments
+        self._segment_bounds = bounds
+        self._segment_graph = compact
+        return compact
+
+
+def _cell_keys(cx, cy):
+    # Pasangan sel (cx, cy) -> satu kunci int64 yang bisa diurutkan
+    return (cx << 32) + (cy + (1 << 31))
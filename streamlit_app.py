@@ -1,79 +1,166 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import pandas as pd
 import streamlit as st
+from matplotlib.collections import LineCollection
 
-from main import Graph, compute_multi_stop_route, create_example_graph
+from loader import graph_path_from_env, load_graph
+from main import ALGORITHMS, Graph, compare_algorithms, solve_multi_stop
+from render import MapLayer, pad_bounds, path_bounds, pixel_size
 
 
 def _get_graph() -> Graph:
     # Cache graf agar tidak dibuat ulang setiap interaksi
     @st.cache_resource(show_spinner=False)
     def _build() -> Graph:
-        return create_example_graph()
+        # BBM_GRAPH_PATH dapat menunjuk snapshot .bbmg yang dibuka lewat mmap dalam hitungan milidetik
+        return load_graph(graph_path_from_env())
 
     return _build()
 
 
 def _compute_route(graph: Graph, start: str, end: str, algorithm: str):
-    solver = graph.dijkstra if algorithm == "Dijkstra" else graph.astar
-    cost, path = solver(start, end)
+    cost, path = graph.route(start, end, algorithm)
     return cost, path
 
-def _collect_unique_edges(graph: Graph) -> List[tuple[str, str]]:
-    seen = set()
-    edges = []
-    for source, neighbors in graph.edges.items():
-        for target, _ in neighbors:
-            key = tuple(sorted((source, target)))
-            if key in seen:
-                continue
-            seen.add(key)
-            edges.append((source, target))
-    return edges
-
-
-def _render_graph(graph: Graph, highlight_paths: List[List[str]]):
-    edges = _collect_unique_edges(graph)
-    fig, ax = plt.subplots(figsize=(8, 6))
+def _compare_algorithms(graph: Graph, sources: List[str], targets: List[str]) -> pd.DataFrame:
+    # Jalankan semua algoritma dengan pencatatan kerja, untuk ditampilkan berdampingan
+    rows = []
+    for stats in compare_algorithms(graph, sources, targets):
+        rows.append(
+            {
+                "Algoritma": stats.algorithm,
+                "Mode": stats.label,
+                "Node settled": stats.settled,
+                "Heap push": stats.pushes,
+                "Heap pop": stats.pops,
+                "Pop basi": stats.stale_pops,
+                "Evaluasi heuristik": stats.heuristic_calls,
+                "Antrian puncak": stats.peak_queue,
+                "Waktu (ms)": round(stats.wall_time_ms, 3),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+# Di atas batas ini jaringan dasar digambar sebagai raster yang di-cache, bukan vektor
+RASTER_EDGE_LIMIT = 2000
+# Label nama hanya digambar jika node yang terlihat tidak lebih dari ini
+LABEL_LIMIT = 200
+FIGURE_PIXELS = (800, 600)
+
+
+def _node_style(name: str) -> Tuple[str, int]:
+    if "Depot" in name:
+        return "#009900", 120
+    if name.startswith("SPBU"):
+        return "#0066cc", 90
+    return "#666666", 70
+
+
+def _render_graph(
+    graph: Graph,
+    highlight_paths: List[List[str]],
+    isochrones: Optional[Dict[str, List[Tuple[float, float]]]] = None,
+    partition: Optional[Dict[str, str]] = None,
+    zoom_to_routes: bool = False,
+):
+    # Jaringan statis diambil dari MapLayer (dibangun sekali per versi graf); hanya rute,
+    # isokron, dan partisi yang digambar ulang setiap rerun.
+    layer = MapLayer.for_graph(graph)
+    fig, ax = plt.subplots(figsize=(FIGURE_PIXELS[0] / 100, FIGURE_PIXELS[1] / 100))
     ax.set_title("Graf Distribusi (skala sederhana)")
 
-    for node_a, node_b in edges:
-        coord_a = graph.coordinates.get(node_a)
-        coord_b = graph.coordinates.get(node_b)
-        if not coord_a or not coord_b:
+    route_coords = [
+        [graph.coordinates.get(node) for node in path] for path in highlight_paths
+    ]
+    route_coords = [coords for coords in route_coords if len(coords) >= 2 and all(c is not None for c in coords)]
+    view = None
+    if zoom_to_routes and route_coords:
+        view = pad_bounds(path_bounds([c for coords in route_coords for c in coords]), 0.15)
+
+    # Wilayah jangkauan (isokron) per sumber, digambar paling bawah
+    iso_colors = ["#2ca02c", "#9467bd", "#ff7f0e", "#17becf"]
+    for idx, (source, polygon) in enumerate((isochrones or {}).items()):
+        if len(polygon) < 3:
             continue
-        ax.plot([coord_a[0], coord_b[0]], [coord_a[1], coord_b[1]], color="#b0b0b0", linewidth=1.5, zorder=1)
+        color = iso_colors[idx % len(iso_colors)]
+        ax.fill(
+            [p[0] for p in polygon],
+            [p[1] for p in polygon],
+            color=color,
+            alpha=0.15,
+            edgecolor=color,
+            linewidth=1.2,
+            zorder=0,
+            label=f"Jangkauan {source}",
+        )
+
+    # Partisi depot: setiap depot mendapat satu warna untuk node dan ruas di wilayahnya
+    partition_colors: Dict[str, str] = {}
+    if partition:
+        palette = plt.get_cmap("tab10")
+        for idx, depot in enumerate(sorted(set(partition.values()))):
+            partition_colors[depot] = palette(idx % 10)
+
+    if view is None and not partition and len(layer) > RASTER_EDGE_LIMIT:
+        ax.imshow(layer.raster(*FIGURE_PIXELS), extent=layer.extent(), origin="upper", zorder=1, aspect="auto")
+    else:
+        # Vektor terpotong ke tampilan dan disederhanakan per piksel, satu LineCollection
+        edges = layer.visible_edges(view, pixel_size(view or layer.bounds, *FIGURE_PIXELS))
+        edge_colors = ["#b0b0b0"] * len(edges)
+        if partition:
+            for i, edge in enumerate(edges):
+                node_a, node_b = layer.endpoints(edge)
+                if partition.get(node_a) is not None and partition.get(node_a) == partition.get(node_b):
+                    edge_colors[i] = partition_colors[partition[node_a]]
+        width = 1.5 if len(edges) <= RASTER_EDGE_LIMIT else 0.6
+        ax.add_collection(LineCollection(layer.lines(edges), colors=edge_colors, linewidths=width, zorder=1))
 
     colors = ["#ff1c1c", "#ffa500", "#1c9cff", "#7ac70c", "#8a2be2"]
-    for idx, path in enumerate(highlight_paths):
-        coords = [graph.coordinates.get(node) for node in path]
-        if any(coord is None for coord in coords) or len(coords) < 2:
-            continue
+    for idx, coords in enumerate(route_coords):
         xs = [c[0] for c in coords]
         ys = [c[1] for c in coords]
         ax.plot(xs, ys, color=colors[idx % len(colors)], linewidth=3, zorder=2)
 
-    for name, coord in graph.coordinates.items():
-        node_type = "SPBU" if name.startswith("SPBU") else ("Depot" if "Depot" in name else "Simpang")
-        if node_type == "Depot":
-            color = "#009900"
-            size = 120
-        elif node_type == "SPBU":
-            color = "#0066cc"
-            size = 90
-        else:
-            color = "#666666"
-            size = 70
-        ax.scatter(coord[0], coord[1], s=size, color=color, edgecolors="white", linewidths=0.8, zorder=3)
-        ax.text(coord[0], coord[1] + 0.0015, name, fontsize=9, ha="center", va="bottom", zorder=4)
+    nodes = layer.visible_nodes(view)
+    if len(nodes) > LABEL_LIMIT:
+        # Jaringan besar: hanya depot dan SPBU yang ditandai, tanpa label
+        nodes = [(name, coord) for name, coord in nodes if _node_style(name)[1] > 70]
+    if nodes:
+        styles = [_node_style(name) for name, _ in nodes]
+        node_colors = [style[0] for style in styles]
+        if partition:
+            node_colors = [partition_colors.get(partition.get(name), "#cccccc") for name, _ in nodes]
+        ax.scatter(
+            [coord[0] for _, coord in nodes],
+            [coord[1] for _, coord in nodes],
+            s=[style[1] for style in styles] if len(nodes) <= LABEL_LIMIT else 20,
+            c=node_colors,
+            edgecolors="white",
+            linewidths=0.8,
+            zorder=3,
+        )
+    if len(nodes) <= LABEL_LIMIT:
+        for name, coord in nodes:
+            ax.text(coord[0], coord[1] + 0.0015, name, fontsize=9, ha="center", va="bottom", zorder=4)
 
+    for depot, color in partition_colors.items():
+        ax.scatter([], [], color=color, label=f"Wilayah {depot}")
+    if isochrones or partition_colors:
+        ax.legend(loc="upper right", fontsize=8)
     ax.set_xlabel("X")
     ax.set_ylabel("Y")
     ax.grid(True, alpha=0.3)
-    ax.set_aspect("equal", adjustable="datalim")
-    ax.margins(x=0.1, y=0.12)
+    if view is not None:
+        ax.set_xlim(view[0], view[2])
+        ax.set_ylim(view[1], view[3])
+    else:
+        min_x, max_x, min_y, max_y = layer.extent(0.12)
+        ax.set_xlim(min_x, max_x)
+        ax.set_ylim(min_y, max_y)
+    ax.set_aspect("equal", adjustable="box")
     fig.tight_layout()
     return fig
 
@@ -96,10 +183,14 @@ dest_options = [name for name in all_locations if name != start_node]
 
 if "highlight_routes" not in st.session_state:
     st.session_state["highlight_routes"] = []
+if "isochrones" not in st.session_state:
+    st.session_state["isochrones"] = {}
+if "partition" not in st.session_state:
+    st.session_state["partition"] = {}
 
 with st.sidebar:
     st.header("Pengaturan")
-    algorithm = st.radio("Algoritma", ["Dijkstra", "A*"])
+    algorithm = st.radio("Algoritma", ALGORITHMS)
     single_destination = st.selectbox("Tujuan tunggal", dest_options, index=0 if dest_options else None)
     multi_destinations = st.multiselect("Tujuan jamak", dest_options)
     enable_multi_stop = st.checkbox("Hitung rute multi tujuan (sekali jalan)")
@@ -109,6 +200,27 @@ with st.sidebar:
     run_single = st.button("Cari rute tunggal")
     run_multi = st.button("Cari rute jamak")
 
+    st.divider()
+    isochrone_minutes = st.number_input("Batas jangkauan (menit)", min_value=0.0, value=10.0, step=1.0)
+    isochrone_sources = st.multiselect("Sumber tambahan (mis. posisi truk)", dest_options)
+    run_isochrone = st.button("Hitung jangkauan")
+
+    st.divider()
+    depot_choices = st.multiselect(
+        "Depot untuk pembagian wilayah",
+        all_locations,
+        default=[name for name in all_locations if "Depot" in name],
+    )
+    run_partition = st.button("Bagi wilayah per depot")
+    clear_overlays = st.button("Hapus overlay peta")
+    zoom_to_routes = st.checkbox("Perbesar peta ke rute yang disorot", value=False)
+
+    cache_stats = graph.route_cache.stats()
+    st.caption(
+        f"Cache rute: {cache_stats['hits']} hit / {cache_stats['misses']} miss "
+        f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} entri"
+    )
+
 col_result, col_map = st.columns([1, 1])
 
 with col_result:
@@ -123,6 +235,8 @@ with col_result:
             st.session_state["highlight_routes"] = [path]
             st.success(f"{algorithm} {start_node} → {single_destination}")
             st.write({"rute": path, "total waktu (menit)": round(cost, 2)})
+            st.caption("Kerja tiap algoritma untuk kueri ini")
+            st.dataframe(_compare_algorithms(graph, [start_node], [single_destination]))
 
     if run_multi:
         if not multi_destinations:
@@ -130,19 +244,27 @@ with col_result:
         else:
             rows = []
             highlights = []
+            # Matriks jarak dihitung sekali per permintaan dan dipakai bersama
+            if enable_multi_stop:
+                stops = [start_node] + multi_destinations
+                matrix = graph.distance_matrix(stops, stops, algorithm)
+            else:
+                matrix = graph.distance_matrix([start_node], multi_destinations, algorithm)
             if enable_multi_stop:
                 try:
-                    total_cost, route_path = compute_multi_stop_route(
+                    result = solve_multi_stop(
                         graph,
                         start_node,
                         multi_destinations,
                         algorithm,
                         return_to_start=return_to_start,
+                        matrix=matrix,
                     )
                 except ValueError as exc:
                     st.error(str(exc))
                     st.session_state["highlight_routes"] = []
                 else:
+                    total_cost, route_path = result.cost, result.path
                     if total_cost == float("inf") or not route_path:
                         st.error("Tidak ditemukan rute yang mencakup semua tujuan.")
                         st.session_state["highlight_routes"] = []
@@ -150,20 +272,21 @@ with col_result:
                         st.success(
                             f"Rute multi tujuan ({algorithm}) dengan total waktu {total_cost:.1f} menit"
                         )
-                        st.write({"rute": route_path})
+                        st.write({"rute": route_path, "urutan kunjungan": result.order, "solver": result.tier})
                         st.session_state["highlight_routes"] = [route_path]
                         rows.append(
                             {
-                                "Tujuan": " → ".join([start_node] + multi_destinations + ([start_node] if return_to_start else [])),
+                                "Tujuan": " → ".join(result.order),
                                 "Status": "OK",
                                 "Rute": route_path,
                                 "Total waktu (menit)": round(total_cost, 2),
+                                "Solver": result.tier,
                             }
                         )
                         st.dataframe(pd.DataFrame(rows))
             else:
                 for dest in multi_destinations:
-                    cost, path = _compute_route(graph, start_node, dest, algorithm)
+                    cost, path = matrix.cost(start_node, dest), matrix.path(start_node, dest)
                     status = "OK"
                     if cost == float("inf") or not path:
                         status = "Tidak tersedia"
@@ -178,13 +301,63 @@ with col_result:
                     if status == "OK":
                         highlights.append(path)
                 st.dataframe(pd.DataFrame(rows))
+                st.caption("Kerja tiap algoritma untuk semua tujuan")
+                st.dataframe(_compare_algorithms(graph, [start_node], multi_destinations))
                 st.session_state["highlight_routes"] = highlights
 
+    if run_isochrone:
+        sources = [start_node] + isochrone_sources
+        isochrone = graph.reachable_within(sources, isochrone_minutes)
+        st.session_state["isochrones"] = isochrone.polygon()
+        origins = isochrone.origins()
+        reachable = sorted(isochrone.costs().items(), key=lambda item: item[1])
+        st.success(f"{len(reachable)} lokasi terjangkau dalam {isochrone_minutes:g} menit")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {"Lokasi": name, "Waktu (menit)": round(cost, 2), "Dari": origins[name]}
+                    for name, cost in reachable
+                ]
+            )
+        )
+
+    if run_partition:
+        if not depot_choices:
+            st.warning("Pilih minimal satu depot.")
+        else:
+            partition = graph.depot_partition(depot_choices)
+            origins = partition.origins()
+            st.session_state["partition"] = origins
+            spbu = sorted((name for name in origins if name.startswith("SPBU")), key=lambda name: (origins[name], name))
+            st.success(f"Wilayah {len(depot_choices)} depot dihitung dalam satu penelusuran")
+            st.dataframe(
+                pd.DataFrame(
+                    [
+                        {"SPBU": name, "Depot terdekat": origins[name], "Waktu (menit)": round(partition.cost(name), 2)}
+                        for name in spbu
+                    ]
+                )
+            )
+            unreachable = [name for name in all_locations if name not in origins]
+            if unreachable:
+                st.caption(f"Tidak terjangkau depot mana pun: {', '.join(unreachable)}")
+
+    if clear_overlays:
+        st.session_state["isochrones"] = {}
+        st.session_state["partition"] = {}
+
 with col_map:
     st.subheader("Visualisasi Graf")
     if not graph.coordinates:
         st.info("Belum ada koordinat yang terekam pada graf.")
     else:
-        fig = _render_graph(graph, st.session_state.get("highlight_routes", []))
+        fig = _render_graph(
+            graph,
+            st.session_state.get("highlight_routes", []),
+            st.session_state.get("isochrones"),
+            st.session_state.get("partition"),
+            zoom_to_routes,
+        )
         st.pyplot(fig)
+        plt.close(fig)  # figure pyplot tidak dilepas sendiri; tanpa ini setiap rerun menumpuk
 